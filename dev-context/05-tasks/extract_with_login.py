@@ -4,10 +4,11 @@ With extended time for manual login
 """
 
 from playwright.sync_api import sync_playwright
-import pandas as pd
 import time
 import re
 
+from thread_inventory import new_inventory, save_inventory
+
 # File paths
 CSV_PATH = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/thread_inventory.csv'
 
@@ -159,30 +160,14 @@ if not threads or len(threads) == 0:
     print("="*80)
     exit(1)
 
-# Create DataFrame
-df = pd.DataFrame(threads)
-
-# Extract thread ID from URL
-df['thread_id'] = df['link'].str.extract(r'/search/([^/?#]+)')
-
-# Add tracking columns
-df['completed'] = False
-df['error'] = ''
-df['export_timestamp'] = ''
-df['file_path'] = ''
-
-# Remove duplicates
-original_count = len(df)
-df = df.drop_duplicates(subset=['thread_id'], keep='first')
-
-if len(df) < original_count:
-    print(f"   Removed {original_count - len(df)} duplicates")
+# Create DataFrame (thread IDs from URLs, duplicates and ID-less rows removed)
+df = new_inventory(threads)
 
-# Remove rows with missing thread_id
-df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
+if len(df) < len(threads):
+    print(f"   Removed {len(threads) - len(df)} duplicates")
 
-# Save to CSV
-df.to_csv(CSV_PATH, index=False)
+# Save to CSV, keeping export progress from an existing inventory
+df = save_inventory(df, CSV_PATH)
 
 print("\n" + "="*80)
 print(f"✅ SUCCESS: Extracted {len(df)} unique threads")
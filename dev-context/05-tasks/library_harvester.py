@@ -0,0 +1,246 @@
+"""
+Perplexity Library Harvester
+Convergence-detecting thread discovery for the Library page
+
+Instead of a fixed number of blind scrolls, a MutationObserver inside the
+page records every /search/ link the moment it is inserted (so rows a
+virtualized list later removes from the DOM are still captured). Each scroll
+then waits only until the harvest grows, and harvesting stops once several
+scrolls in a row add nothing - small libraries finish in seconds, large ones
+run until the list is exhausted.
+
+LibraryResponseCapture is the network alternative: it listens for the
+Library's own JSON list responses (page.on("response")) and builds thread
+records straight from those payloads - exact IDs, titles and dates, no DOM
+heuristics - scrolling only to make the app request its next page.
+
+Usage:
+  from library_harvester import harvest_library, LibraryResponseCapture
+
+  page.goto('https://www.perplexity.ai/library')
+  threads = harvest_library(page)   # [{'title', 'link', 'date'}, ...]
+
+  capture = LibraryResponseCapture(page)   # attach before page.goto
+  page.goto('https://www.perplexity.ai/library')
+  threads = capture.collect(page)   # [{'title', 'link', 'date', 'thread_id'}, ...]
+"""
+
+import time
+from urllib.parse import urlsplit
+
+IDLE_SCROLLS = 3  # Stop after this many scrolls in a row add no threads
+SCROLL_WAIT_MS = 3000  # Max wait for new threads after each scroll
+MAX_SCROLLS = 1000  # Safety cap
+RESPONSE_WAIT_MS = 5000  # Max wait for the next Library list response
+
+# Paths of the Library's JSON thread-list endpoints (matched exactly; if
+# Perplexity renames them nothing is captured and the DOM harvest is used)
+LIBRARY_LIST_PATHS = {'/rest/thread/list_ask_threads', '/rest/thread/list'}
+LIBRARY_HOSTS = {'www.perplexity.ai', 'perplexity.ai'}
+# Payload keys that may hold the list of threads
+LIST_KEYS = ['threads', 'items', 'entries', 'results', 'data']
+THREAD_URL = 'https://www.perplexity.ai/search/{}'
+
+# Installs window.__ycHarvest (href -> thread) and the observer; idempotent
+HARVEST_INIT_JS = """
+() => {
+    if (window.__ycHarvest) {
+        return window.__ycHarvest.size;
+    }
+    const harvest = new Map();
+    window.__ycHarvest = harvest;
+
+    const readThread = (el) => {
+        const link = el.href;
+        if (!link || !link.includes('/search/')) return;
+
+        // Title: same strategies as the original extractor
+        const titleEl = el.querySelector('[class*="title"]') ||
+                        el.querySelector('h3') ||
+                        el.querySelector('h4') ||
+                        el.querySelector('[class*="text"]') ||
+                        el.querySelector('div');
+        let title = (titleEl ? titleEl.textContent : el.textContent) || '';
+        title = title.replace(/\\s+/g, ' ').trim().substring(0, 200);
+
+        const dateEl = el.querySelector('[class*="date"]') ||
+                       el.querySelector('time') ||
+                       el.closest('div')?.querySelector('[class*="date"]') ||
+                       el.closest('li')?.querySelector('time');
+        const date = dateEl ? (dateEl.textContent?.trim() || dateEl.getAttribute('datetime') || '') : '';
+
+        const known = harvest.get(link);
+        if (title && (!known || title.length > known.title.length || (!known.date && date))) {
+            harvest.set(link, { title, link, date: date || (known ? known.date : '') });
+        }
+    };
+
+    const scan = (root) => {
+        if (root.nodeType !== 1) {
+            root = root.parentElement;
+            if (!root) return;
+        }
+        const anchor = root.closest('a[href*="/search/"]');
+        if (anchor) readThread(anchor);
+        root.querySelectorAll('a[href*="/search/"]').forEach(readThread);
+    };
+
+    scan(document.body);
+    new MutationObserver((mutations) => {
+        for (const m of mutations) {
+            if (m.type === 'childList') {
+                m.addedNodes.forEach(scan);
+            } else {
+                scan(m.target);
+            }
+        }
+    }).observe(document.body, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['href'],
+    });
+    return harvest.size;
+}
+"""
+
+# Scroll both the window and whatever container holds the last row
+SCROLL_JS = """
+() => {
+    const links = document.querySelectorAll('a[href*="/search/"]');
+    if (links.length) links[links.length - 1].scrollIntoView({ block: 'end' });
+    window.scrollTo(0, document.body.scrollHeight);
+}
+"""
+
+def harvest_library(page, idle_scrolls=IDLE_SCROLLS, scroll_wait_ms=SCROLL_WAIT_MS,
+                    max_scrolls=MAX_SCROLLS, log=print):
+    """
+    Scroll the Library until no new threads appear
+    Returns: list of {'title', 'link', 'date'} dicts in discovery order
+    """
+    count = page.evaluate(HARVEST_INIT_JS)
+    log(f"→ Harvesting threads ({count} visible, stops after {idle_scrolls} idle scrolls)...")
+
+    started = time.time()
+    idle = 0
+    scrolls = 0
+    while idle < idle_scrolls and scrolls < max_scrolls:
+        page.evaluate(SCROLL_JS)
+        scrolls += 1
+        try:
+            page.wait_for_function('n => window.__ycHarvest.size > n', arg=count, timeout=scroll_wait_ms)
+        except Exception:
+            pass  # Timed out - nothing new arrived after this scroll
+
+        new_count = page.evaluate('() => window.__ycHarvest.size')
+        if new_count > count:
+            idle = 0
+            if new_count // 100 > count // 100:
+                log(f"  {new_count} threads after {scrolls} scrolls...")
+        else:
+            idle += 1
+        count = new_count
+
+    log(f"✓ Harvested {count} threads in {scrolls} scrolls ({time.time() - started:.0f}s)")
+    return page.evaluate('() => Array.from(window.__ycHarvest.values())')
+
+class LibraryResponseCapture:
+    """Collect Library threads from the app's own JSON list responses"""
+
+    def __init__(self, page):
+        self.threads = {}  # thread_id -> record, in discovery order
+        self.pending = []
+        self.responses = 0
+        page.on('response', self._on_response)
+
+    def _is_list_response(self, response):
+        url = urlsplit(response.url)
+        content_type = response.headers.get('content-type', '')
+        return ('application/json' in content_type and
+                url.hostname in LIBRARY_HOSTS and
+                url.path.rstrip('/') in LIBRARY_LIST_PATHS)
+
+    def _on_response(self, response):
+        # Bodies are read later from collect(), not inside the event handler
+        if self._is_list_response(response):
+            self.pending.append(response)
+
+    def _drain(self):
+        while self.pending:
+            response = self.pending.pop(0)
+            try:
+                payload = response.json()
+            except Exception:
+                continue
+            self.responses += 1
+            for item in thread_items(payload):
+                record = thread_record(item)
+                if record and record['thread_id'] not in self.threads:
+                    self.threads[record['thread_id']] = record
+
+    def _wait_for_list(self, page, timeout_ms):
+        if not self.pending:
+            try:
+                page.wait_for_event('response', predicate=self._is_list_response, timeout=timeout_ms)
+            except Exception:
+                pass  # No further list page was requested
+        self._drain()
+
+    def collect(self, page, idle_scrolls=IDLE_SCROLLS, response_wait_ms=RESPONSE_WAIT_MS,
+                max_scrolls=MAX_SCROLLS, log=print):
+        """
+        Scroll until the Library stops requesting new pages
+        Returns: list of {'title', 'link', 'date', 'thread_id'} dicts
+        """
+        started = time.time()
+        if not self.threads:
+            self._wait_for_list(page, response_wait_ms)
+        log(f"→ Capturing Library responses ({len(self.threads)} threads so far)...")
+
+        idle = 0
+        scrolls = 0
+        while idle < idle_scrolls and scrolls < max_scrolls:
+            before = len(self.threads)
+            page.evaluate(SCROLL_JS)
+            scrolls += 1
+            self._wait_for_list(page, response_wait_ms)
+            idle = 0 if len(self.threads) > before else idle + 1
+
+        log(f"✓ Captured {len(self.threads)} threads from {self.responses} responses "
+            f"in {scrolls} scrolls ({time.time() - started:.0f}s)")
+        return list(self.threads.values())
+
+def thread_items(payload):
+    """Find the list of thread objects in a Library response payload"""
+    if isinstance(payload, list):
+        return [item for item in payload if isinstance(item, dict)]
+    if isinstance(payload, dict):
+        for key in LIST_KEYS:
+            value = payload.get(key)
+            if isinstance(value, list):
+                return [item for item in value if isinstance(item, dict)]
+            if isinstance(value, dict):
+                return thread_items(value)
+    return []
+
+def thread_record(item):
+    """
+    Normalize one thread object to an inventory record
+    Only items with a thread slug or a /search/ link are threads; anything
+    else (collections, spaces, bare uuid/id objects) returns None
+    """
+    thread_id = item.get('slug') or item.get('url_slug') or item.get('thread_slug')
+    link = item.get('url') or ''
+    if not thread_id and '/search/' in link:
+        thread_id = link.split('/search/', 1)[1].split('?')[0].split('#')[0]
+    title = item.get('title') or item.get('query_str') or item.get('query') or ''
+    if not thread_id or not title:
+        return None
+
+    date = (item.get('last_query_datetime') or item.get('updated_at') or
+            item.get('created_at') or item.get('date') or '')
+    return {
+        'title': ' '.join(str(title).split())[:200],
+        'link': link if '/search/' in link else THREAD_URL.format(thread_id),
+        'date': str(date),
+        'thread_id': str(thread_id),
+    }
@@ -4,9 +4,10 @@ Opens browser and waits for you to manually navigate and click a button when rea
 """
 
 from playwright.sync_api import sync_playwright
-import pandas as pd
 import time
 
+from thread_inventory import new_inventory, save_inventory, THREAD_ID_PATTERN
+
 # File paths
 CSV_PATH = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/thread_inventory.csv'
 
@@ -180,38 +181,18 @@ What was the URL you were on when you pressed ENTER?
 
 # Create DataFrame
 print(f"\n→ Found {len(threads)} potential threads")
-df = pd.DataFrame(threads)
-
-# Extract thread ID from URL
-df['thread_id'] = df['link'].str.extract(r'/search/([^/?#]+)')
-
-# If no search URLs, try alternative ID extraction
-if df['thread_id'].isna().all():
-    print("   Using alternative ID extraction...")
-    df['thread_id'] = df['link'].str.extract(r'/([^/?#]+)$')
-
-# Add tracking columns
-df['completed'] = False
-df['error'] = ''
-df['export_timestamp'] = ''
-df['file_path'] = ''
-
-# Remove duplicates
-original_count = len(df)
-df = df.drop_duplicates(subset=['thread_id'], keep='first')
-
-if len(df) < original_count:
-    print(f"   Removed {original_count - len(df)} duplicates")
+# Thread ID from /search/ URLs, or the last path segment if there are none
+df = new_inventory(threads, id_patterns=(THREAD_ID_PATTERN, r'/([^/?#]+)$'))
 
-# Remove rows with missing thread_id
-df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
+if len(df) < len(threads):
+    print(f"   Removed {len(threads) - len(df)} duplicates")
 
 if len(df) == 0:
     print("\n❌ All threads were filtered out (missing IDs)")
     exit(1)
 
-# Save to CSV
-df.to_csv(CSV_PATH, index=False)
+# Save to CSV, keeping export progress from an existing inventory
+df = save_inventory(df, CSV_PATH)
 
 print("\n" + "="*80)
 print(f"✅ SUCCESS: Extracted {len(df)} unique threads!")
@@ -0,0 +1,296 @@
+"""
+Perplexity Thread Export - Async Engine
+Shared asyncio/async_playwright export engine for the Perplexity exporters
+
+Runs several pages concurrently on one event loop (one isolated browser
+context per page, all sharing the saved login) and replaces fixed sleeps
+with event-driven waits: each step waits for the element it actually needs
+(content, Export button, export menu item) and the download is awaited with
+expect_download around the menu click.
+
+Usage (from an exporter):
+  from perplexity_async_export import run_async_export
+
+  success, failed = asyncio.run(run_async_export(pending, CONFIG, workers=4,
+                                                 on_result=record_result))
+
+Several accounts can run side by side on one loop by passing each
+run_async_export the same budget (asyncio.Semaphore), which caps the total
+number of open pages; pacing stays per account (one limiter per run, since
+politeness belongs to each logged-in session). With config['account'] set,
+log records go to the 'export.<account>' logger.
+"""
+
+import asyncio
+import os
+import re
+import time
+import logging
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from route_profile import apply_route_profile_async
+
+# Selectors are combined with Locator.or_() and resolved with .first, so only
+# element-specific selectors are listed (broad containers like
+# 'div:has-text("Markdown")' would match the page wrapper first)
+CONTENT_SELECTORS = [
+    '[class*="thread"]',
+    '[class*="message"]',
+    '[class*="answer"]',
+    '[data-testid*="thread"]',
+    'article',
+    'main',
+]
+
+EXPORT_SELECTORS = [
+    'button:has-text("Export")',
+    '[aria-label*="Export"]',
+    '[aria-label*="export"]',
+    'button[class*="export"]',
+    '[data-testid*="export"]',
+    '[role="button"]:has-text("Export")',
+]
+
+MARKDOWN_SELECTORS = [
+    '[role="menuitem"]:has-text("Markdown")',
+    '[role="option"]:has-text("Markdown")',
+    'button:has-text("Markdown")',
+    '[data-format="markdown"]',
+    'text="Markdown"',
+]
+
+TEXT_SELECTORS = [
+    '[role="menuitem"]:has-text("Text")',
+    'button:has-text("Text")',
+    'text="Text"',
+    'text="Plain text"',
+]
+
+EXPORT_MENU_TIMEOUT_MS = 5000  # Export menu renders right after the click
+
+def sanitize_filename(text, max_length=50):
+    """Convert text to safe filename"""
+    if not text:
+        return 'untitled'
+    text = re.sub(r'[^\w\s-]', '', str(text))
+    text = re.sub(r'[-\s]+', '_', text)
+    return text[:max_length].strip('_').lower()
+
+def any_of(page, selectors):
+    """Single locator matching any of the selectors (first match wins)"""
+    locator = page.locator(selectors[0])
+    for selector in selectors[1:]:
+        locator = locator.or_(page.locator(selector))
+    return locator.first
+
+def account_logger(config):
+    """Logger for one account's run (records still reach the root handlers)"""
+    account = config.get('account')
+    return logging.getLogger(f"export.{account}") if account else logging.getLogger()
+
+class AsyncPolitenessLimiter:
+    """Spacing between thread exports across all pages of one run (one session)"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        """Wait until this caller's slot comes up"""
+        async with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds):
+        """Push every page's next slot back (batch breaks)"""
+        self.next_slot = max(self.next_slot, time.time()) + seconds
+
+async def export_single_thread_async(page, thread, config):
+    """
+    Export one thread to markdown using event-driven waits
+    Returns: (success: bool, error_message: str, file_path: str)
+    """
+    try:
+        await page.goto(thread['link'], timeout=config['timeout_ms'], wait_until='domcontentloaded')
+
+        try:
+            await any_of(page, CONTENT_SELECTORS).wait_for(state='visible', timeout=config['content_wait_ms'])
+        except PlaywrightTimeoutError:
+            return False, "Content did not load (no content selectors found)", None
+
+        # The Export button only renders once the thread has finished loading
+        export_btn = any_of(page, EXPORT_SELECTORS)
+        try:
+            await export_btn.wait_for(state='visible', timeout=config['content_wait_ms'])
+        except PlaywrightTimeoutError:
+            return False, "Export button not found (tried all selectors)", None
+        await export_btn.click()
+
+        # Wait for the export menu itself; fall back to Text if Markdown is missing
+        menu_item = any_of(page, MARKDOWN_SELECTORS)
+        try:
+            await menu_item.wait_for(state='visible', timeout=EXPORT_MENU_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            menu_item = any_of(page, TEXT_SELECTORS)
+            try:
+                await menu_item.wait_for(state='visible', timeout=EXPORT_MENU_TIMEOUT_MS)
+            except PlaywrightTimeoutError:
+                return False, "Markdown option not found in export menu (tried Markdown and Text)", None
+
+        try:
+            async with page.expect_download(timeout=config['timeout_ms']) as download_info:
+                await menu_item.click()
+            download = await download_info.value
+
+            # Generate clean filename
+            safe_title = sanitize_filename(thread.get('title', 'untitled'))
+            thread_id = thread.get('thread_id', 'unknown')
+            filename = f"{thread_id}_{safe_title}.md"
+            filepath = os.path.join(config['export_dir'], filename)
+
+            await download.save_as(filepath)
+
+            # Verify file was saved
+            if not os.path.exists(filepath):
+                return False, "File was not saved to disk", None
+
+            file_size = os.path.getsize(filepath)
+            if file_size < 50:
+                return False, f"File too small ({file_size} bytes) - may be empty", None
+
+            account_logger(config).info(f"  ✅ File saved: {filename} ({file_size:,} bytes)")
+            return True, "", filename
+
+        except Exception as e:
+            return False, f"Download failed: {str(e)[:100]}", None
+
+    except Exception as e:
+        error_msg = str(e)[:200]
+        account_logger(config).error(f"  ❌ Exception: {error_msg}")
+        return False, error_msg, None
+
+async def export_worker_async(worker_id, context, config, work_queue, limiter, results, budget=None):
+    """
+    Pull threads from work_queue and export them, one page at a time
+    Every thread taken yields exactly one result (a failure if anything
+    raises, even opening the page), and None is put when the worker exits
+    """
+    try:
+        while True:
+            try:
+                thread = work_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            page = None
+            acquired = False
+            try:
+                # Pace (and take batch breaks) before claiming a shared budget
+                # slot, so a waiting account never holds pages other accounts need
+                await limiter.wait()
+                if budget:
+                    await budget.acquire()
+                    acquired = True
+                account_logger(config).info(f"[{worker_id}] → {str(thread['title'])[:60]} ({thread['thread_id']})")
+                page = await context.new_page()
+                success, error, file_path = await export_single_thread_async(page, thread, config)
+            except Exception as e:
+                success, error, file_path = False, f"Unexpected error: {str(e)[:150]}", None
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                if acquired:
+                    budget.release()
+
+            await results.put((worker_id, thread, success, error, file_path))
+    finally:
+        results.put_nowait(None)
+
+async def run_async_export(pending, config, workers, on_result, browser_type='firefox', budget=None):
+    """
+    Export pending threads with N concurrent pages on one event loop
+
+    pending: DataFrame of threads to export
+    config: Exporter CONFIG (export_dir, auth_state_file, timeouts, delays)
+    workers: Number of concurrent pages (each in its own browser context)
+    on_result: Called as on_result(done, total, thread, success, error, file_path)
+               for every finished thread - the only place status is written
+    browser_type: 'firefox' or 'chromium'
+    budget: Optional asyncio.Semaphore capping open pages across several runs
+
+    Returns: (success_count, failure_count)
+    """
+    total = len(pending)
+    work_queue = asyncio.Queue()
+    for _, thread in pending.iterrows():
+        work_queue.put_nowait(thread)
+
+    results = asyncio.Queue()
+    limiter = AsyncPolitenessLimiter(config['delay_seconds'])
+    log = account_logger(config)
+    workers = max(1, min(workers, total))
+    account = config.get('account')
+    prefix = f"{account} " if account else ''
+
+    success_count = 0
+    failure_count = 0
+
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_type).launch(headless=False)
+        contexts = []
+        for _ in range(workers):
+            context = await browser.new_context(storage_state=config['auth_state_file'])
+            context.set_default_timeout(config['timeout_ms'])
+            if config.get('block_resources'):
+                await apply_route_profile_async(context, config.get('route_profile'))
+            contexts.append(context)
+
+        log.info(f"🚀 Async engine: {prefix}{workers} concurrent pages on one event loop")
+        tasks = [
+            asyncio.create_task(export_worker_async(f"{prefix}page {n}", context, config, work_queue,
+                                                    limiter, results, budget))
+            for n, context in enumerate(contexts, 1)
+        ]
+
+        done = 0
+        running = len(tasks)
+        try:
+            # Until every worker has put its None (all threads are accounted for)
+            while running:
+                item = await results.get()
+                if item is None:
+                    running -= 1
+                    continue
+
+                worker_id, thread, success, error, file_path = item
+                done += 1
+
+                if success:
+                    success_count += 1
+                    log.info(f"  ✅ [{worker_id}] SUCCESS: Exported to {file_path}")
+                else:
+                    failure_count += 1
+                    log.warning(f"  ❌ [{worker_id}] FAILED: {error}")
+
+                on_result(done, total, thread, success, error, file_path)
+
+                # Batch break: hold every page's next slot (this run only)
+                if done % config['batch_size'] == 0 and done < total:
+                    log.info(f"BATCH CHECKPOINT: {prefix}{done} threads processed - "
+                             f"pausing all pages for {config['batch_break_seconds']} seconds")
+                    limiter.pause(config['batch_break_seconds'])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await browser.close()
+
+    return success_count, failure_count
@@ -2,11 +2,20 @@
 Perplexity Thread Bulk Exporter
 CSV-driven approach with progress tracking and error recovery
 
+Accounts are described in an account-profile file (perplexity_accounts.json):
+each profile has its own login state, inventory CSV, status journal, export
+dir and log. --account picks one profile (default: personal); --accounts a,b
+exports several at once on one event loop under a shared --workers budget.
+
 Usage:
   python perplexity_exporter.py --extract    # Extract thread metadata
   python perplexity_exporter.py --test       # Test with 10 threads
   python perplexity_exporter.py --full       # Export all threads
+  python perplexity_exporter.py --full --workers 4  # Export with 4 parallel browsers
+  python perplexity_exporter.py --full --engine async --workers 4  # 4 pages on one event loop
   python perplexity_exporter.py --report     # Show progress report
+  python perplexity_exporter.py --account account2 --full    # Export another profile
+  python perplexity_exporter.py --accounts personal,account2 --full --workers 4  # Both at once
 """
 
 import pandas as pd
@@ -17,30 +26,97 @@ from datetime import datetime
 import logging
 import argparse
 import re
-
-# Configuration
+import json
+import queue
+import threading
+import asyncio
+import signal
+
+from library_harvester import harvest_library, LibraryResponseCapture
+from route_profile import apply_route_profile, merge_profile
+from selector_cache import SelectorCache
+from thread_inventory import new_inventory, save_inventory, STATUS_COLUMNS
+
+# Account profiles (paths are relative to the profile file)
+PROFILES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perplexity_accounts.json')
+DEFAULT_ACCOUNT = 'personal'
+PROFILE_PATH_KEYS = ['csv_path', 'journal_path', 'export_dir', 'log_file',
+                     'auth_state_file', 'selector_cache_file']
+
+# Configuration (account paths are filled in by use_account)
 CONFIG = {
-    'csv_path': '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/thread_inventory-personal.csv',
-    'export_dir': '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/01-research/perplexity-exports',
-    'log_file': '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/export_log.txt',
-    'auth_state_file': '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/perplexity_auth_state.json',
+    'account': None,
+    'label': '',
+    'browser': 'firefox',  # Firefox is better at bypassing Cloudflare
     'delay_seconds': 3,
     'batch_size': 50,
     'batch_break_seconds': 120,
     'timeout_ms': 60000,  # Increased to 60 seconds for longer threads
     'content_wait_ms': 20000,  # Wait up to 20 seconds for content to load
+    'block_resources': True,  # Abort images/media/fonts/trackers during export (route_profile)
+    'route_profile': None,  # Overrides for route_profile.DEFAULT_PROFILE (an account profile may set its own)
+    'materialize_seconds': 900,  # Refresh the CSV from the status journal at most this often (dashboard)
 }
 
-# Setup logging
+# Learned selector ranking (winning selectors are tried first); set by use_account
+SELECTOR_CACHE = None
+
+# Setup logging (account log files are added by use_account)
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler(CONFIG['log_file']),
         logging.StreamHandler()
     ]
 )
 
+def load_account_profile(name, profiles_file=PROFILES_FILE):
+    """
+    Build a full config for one account profile
+    Returns: CONFIG defaults overlaid with the profile (paths made absolute)
+    """
+    with open(profiles_file) as f:
+        profiles = json.load(f)
+    if name not in profiles:
+        raise KeyError(f"Unknown account '{name}' (profiles: {', '.join(profiles)})")
+
+    base_dir = os.path.dirname(os.path.abspath(profiles_file))
+    config = dict(CONFIG)
+    config.update(profiles[name])
+    for key in PROFILE_PATH_KEYS:
+        config[key] = os.path.normpath(os.path.join(base_dir, config[key]))
+    config['account'] = name
+    config['label'] = config.get('label') or name
+    merge_profile(config['route_profile'])  # reject unknown keys before any browser starts
+    return config
+
+def add_log_file(path, logger=None):
+    """Also write logger's records (default: root) to path; reuses an attached handler"""
+    logger = logger or logging.getLogger()
+    path = os.path.abspath(path)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == path:
+            return handler
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(handler)
+    return handler
+
+_account_log_handler = None  # root-logger file handler of the active account
+
+def use_account(name, profiles_file=PROFILES_FILE):
+    """Make an account profile the active CONFIG (single-account commands)"""
+    global SELECTOR_CACHE, _account_log_handler
+    CONFIG.update(load_account_profile(name, profiles_file))
+    SELECTOR_CACHE = SelectorCache(CONFIG['selector_cache_file'])
+
+    # Only the active account's log file gets the run log
+    if _account_log_handler is not None:
+        logging.getLogger().removeHandler(_account_log_handler)
+        _account_log_handler.close()
+    _account_log_handler = add_log_file(CONFIG['log_file'])
+
 def sanitize_filename(text, max_length=50):
     """Convert text to safe filename"""
     if not text:
@@ -49,15 +125,18 @@ def sanitize_filename(text, max_length=50):
     text = re.sub(r'[-\s]+', '_', text)
     return text[:max_length].strip('_').lower()
 
-def extract_thread_metadata():
-    """Phase 1: Extract all threads from Library"""
+def extract_thread_metadata(source='dom'):
+    """
+    Phase 1: Extract all threads from Library
+    source: 'dom' (scroll and scrape anchors) or 'network' (read the
+            Library's own JSON list responses, DOM fallback if none are seen)
+    """
     logging.info("="*80)
-    logging.info("PHASE 1: METADATA EXTRACTION")
+    logging.info(f"PHASE 1: METADATA EXTRACTION - {CONFIG['label']}")
     logging.info("="*80)
 
     with sync_playwright() as p:
-        # Try Firefox - better at bypassing Cloudflare
-        browser = p.firefox.launch(headless=False)
+        browser = getattr(p, CONFIG['browser']).launch(headless=False)
 
         # Check for saved authentication state
         auth_state_exists = os.path.exists(CONFIG['auth_state_file'])
@@ -89,93 +168,31 @@ def extract_thread_metadata():
             context.storage_state(path=CONFIG['auth_state_file'])
             logging.info("✅ Authentication saved for future runs\n")
 
+        # Listen for the Library's JSON before navigating so page 1 is captured
+        capture = LibraryResponseCapture(page) if source == 'network' else None
+
         # Navigate to Library (with increased timeout)
         logging.info("→ Navigating to Perplexity Library...")
         try:
             page.goto('https://www.perplexity.ai/library', timeout=60000, wait_until='domcontentloaded')
-            # Don't wait for networkidle as Perplexity may have continuous activity
-            time.sleep(8)  # Give dynamic content time to load
+            if source != 'network':
+                # Don't wait for networkidle as Perplexity may have continuous activity
+                time.sleep(8)  # Give dynamic content time to load
         except Exception as e:
             logging.error(f"❌ Failed to load Library page: {str(e)}")
             logging.error("Please ensure you're logged into Perplexity and try again.")
             browser.close()
             return None
 
-        # Scroll to load all threads (handles lazy loading)
-        logging.info("→ Scrolling to load all threads...")
-        for i in range(5):
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            time.sleep(1)
-            logging.info(f"  Scroll {i+1}/5...")
-
-        time.sleep(2)  # Final wait for content
-
-        # Extract thread data using multiple selector strategies
-        logging.info("→ Extracting thread metadata...")
-        threads = page.evaluate("""
-            () => {
-                const threads = [];
-
-                // Strategy 1: Find all links containing /search/
-                const searchLinks = document.querySelectorAll('a[href*="/search/"]');
-
-                console.log('Found', searchLinks.length, 'search links');
-
-                searchLinks.forEach((el, index) => {
-                    // Get the link
-                    const link = el.href;
-
-                    // Try to find title (multiple strategies)
-                    let title = '';
-
-                    // Look for title element
-                    const titleEl = el.querySelector('[class*="title"]') ||
-                                   el.querySelector('h3') ||
-                                   el.querySelector('h4') ||
-                                   el.querySelector('[class*="text"]') ||
-                                   el.querySelector('div');
-
-                    if (titleEl) {
-                        title = titleEl.textContent?.trim();
-                    } else {
-                        // Fallback to link text
-                        title = el.textContent?.trim();
-                    }
-
-                    // Clean up title (remove extra whitespace, newlines)
-                    if (title) {
-                        title = title.replace(/\\s+/g, ' ').trim();
-                        // Take first 200 chars if very long
-                        if (title.length > 200) {
-                            title = title.substring(0, 200);
-                        }
-                    }
-
-                    // Try to find date
-                    let date = '';
-                    const dateEl = el.querySelector('[class*="date"]') ||
-                                  el.querySelector('time') ||
-                                  el.closest('div')?.querySelector('[class*="date"]') ||
-                                  el.closest('li')?.querySelector('time');
-
-                    if (dateEl) {
-                        date = dateEl.textContent?.trim() || dateEl.getAttribute('datetime') || '';
-                    }
-
-                    // Only add if we have both link and title
-                    if (link && title && title.length > 0) {
-                        threads.push({
-                            title: title,
-                            link: link,
-                            date: date,
-                        });
-                    }
-                });
-
-                console.log('Extracted', threads.length, 'valid threads');
-                return threads;
-            }
-        """)
+        threads = None
+        if capture is not None:
+            threads = capture.collect(page, log=logging.info)
+            if not threads:
+                logging.warning("⚠️  No Library JSON responses captured - falling back to DOM harvest")
+
+        if not threads:
+            # Scroll until the Library stops growing (observer keeps virtualized rows)
+            threads = harvest_library(page, log=logging.info)
 
         browser.close()
 
@@ -191,29 +208,15 @@ def extract_thread_metadata():
 
     # Create DataFrame
     logging.info(f"→ Processing {len(threads)} extracted threads...")
-    df = pd.DataFrame(threads)
-
-    # Extract thread ID from URL
-    df['thread_id'] = df['link'].str.extract(r'/search/([^/?#]+)')
-
-    # Add tracking columns
-    df['completed'] = False
-    df['error'] = ''
-    df['export_timestamp'] = ''
-    df['file_path'] = ''
-
-    # Remove duplicates based on thread_id
-    original_count = len(df)
-    df = df.drop_duplicates(subset=['thread_id'], keep='first')
-
-    if len(df) < original_count:
-        logging.info(f"  Removed {original_count - len(df)} duplicate threads")
+    # Thread IDs from URLs (network capture already has exact IDs)
+    df = new_inventory(threads)
 
-    # Remove any rows with missing thread_id
-    df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
+    if len(df) < len(threads):
+        logging.info(f"  Removed {len(threads) - len(df)} duplicate threads")
 
-    # Save to CSV
-    df.to_csv(CONFIG['csv_path'], index=False)
+    # Fold journaled statuses into the CSV, then merge so export progress survives
+    materialize_inventory()
+    df = save_inventory(df, CONFIG['csv_path'], log=logging.info)
 
     logging.info("\n" + "="*80)
     logging.info(f"✅ SUCCESS: Extracted {len(df)} unique threads")
@@ -221,25 +224,97 @@ def extract_thread_metadata():
     logging.info(f"\n📄 Saved to: {CONFIG['csv_path']}")
     logging.info(f"\n📊 Next steps:")
     logging.info(f"  1. Open perplexity_dashboard.html in your browser")
-    logging.info(f"  2. Click 'Load CSV' and select: thread_inventory-personal.csv")
-    logging.info(f"  3. Run test: python perplexity_exporter.py --test\n")
+    logging.info(f"  2. Click 'Load CSV' and select: {os.path.basename(CONFIG['csv_path'])}")
+    logging.info(f"  3. Run test: python perplexity_exporter.py --account {CONFIG['account']} --test\n")
 
     return df
 
-def update_thread_status(thread_id, completed, error='', file_path=''):
-    """Update single thread status in CSV (atomic operation)"""
+def update_thread_status(thread_id, completed, error='', file_path='', config=None):
+    """Append one status record to the journal (O(1), crash-safe)"""
+    config = config or CONFIG
+    record = {
+        'thread_id': thread_id,
+        'completed': bool(completed),
+        'error': str(error) if error else '',
+        'export_timestamp': datetime.now().isoformat(),
+        'file_path': file_path if file_path else '',
+    }
     try:
-        df = pd.read_csv(CONFIG['csv_path'])
-        mask = df['thread_id'] == thread_id
+        with open(config['journal_path'], 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception as e:
+        logging.error(f"Failed to journal status for thread {thread_id}: {str(e)}")
+
+def read_status_journal(config=None):
+    """
+    Read the status journal as a DataFrame (latest record per thread)
+    A torn last line from a crash mid-append is skipped
+    """
+    config = config or CONFIG
+    records = []
+    if os.path.exists(config['journal_path']):
+        with open(config['journal_path']) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+
+    if not records:
+        return pd.DataFrame(columns=['thread_id'] + STATUS_COLUMNS)
+
+    return pd.DataFrame(records).drop_duplicates(subset=['thread_id'], keep='last')
+
+def load_inventory(config=None):
+    """Load the CSV inventory with journaled statuses applied on top"""
+    config = config or CONFIG
+    df = pd.read_csv(config['csv_path'])
+    journal = read_status_journal(config)
+
+    if len(journal) > 0:
+        columns = df.columns
+        df[STATUS_COLUMNS] = df[STATUS_COLUMNS].astype(object)
+        df = df.set_index('thread_id')
+        journal = journal.set_index('thread_id')
+        known = journal.index.intersection(df.index)
+        df.loc[known, STATUS_COLUMNS] = journal.loc[known, STATUS_COLUMNS]
+        df = df.reset_index()[columns]
 
-        df.loc[mask, 'completed'] = completed
-        df.loc[mask, 'error'] = str(error) if error else ''
-        df.loc[mask, 'export_timestamp'] = datetime.now().isoformat()
-        df.loc[mask, 'file_path'] = file_path if file_path else ''
+    # Convert completed column to boolean if needed
+    df['completed'] = df['completed'].astype(str).str.lower() == 'true'
+    return df
 
-        df.to_csv(CONFIG['csv_path'], index=False)
+def materialize_inventory(config=None):
+    """Fold the status journal into the CSV (atomic replace) and truncate the journal"""
+    config = config or CONFIG
+    if not os.path.exists(config['journal_path']):
+        return
+    try:
+        df = load_inventory(config)
+        tmp_path = config['csv_path'] + '.tmp'
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, config['csv_path'])
+        # Replaying the journal is idempotent, so a crash before this is harmless
+        os.remove(config['journal_path'])
     except Exception as e:
-        logging.error(f"Failed to update CSV for thread {thread_id}: {str(e)}")
+        logging.error(f"Failed to materialize inventory CSV: {str(e)}")
+
+_last_materialized = {}  # csv_path -> time of the last mid-run refresh
+
+def refresh_inventory(config=None):
+    """
+    Mid-run CSV refresh for the dashboard, at most every materialize_seconds
+    Readers (--report, load_inventory) already see the journal, so the full
+    CSV rewrite only happens this rarely and once at the end of the run
+    """
+    config = config or CONFIG
+    now = time.time()
+    last = _last_materialized.setdefault(config['csv_path'], now)
+    if now - last >= config['materialize_seconds']:
+        materialize_inventory(config)
+        _last_materialized[config['csv_path']] = now
 
 def export_single_thread(page, thread):
     """
@@ -268,10 +343,11 @@ def export_single_thread(page, thread):
         ]
 
         content_loaded = False
-        for selector in content_selectors:
+        for selector in SELECTOR_CACHE.ranked('content', content_selectors):
             try:
                 page.wait_for_selector(selector, timeout=CONFIG['content_wait_ms'])
                 content_loaded = True
+                SELECTOR_CACHE.record('content', selector)
                 logging.info(f"  ✓ Content loaded (selector: {selector})")
                 break
             except:
@@ -295,12 +371,13 @@ def export_single_thread(page, thread):
         ]
 
         export_clicked = False
-        for selector in export_selectors:
+        for selector in SELECTOR_CACHE.ranked('export', export_selectors):
             try:
                 export_btn = page.locator(selector).first
                 if export_btn.is_visible(timeout=2000):
                     export_btn.click()
                     export_clicked = True
+                    SELECTOR_CACHE.record('export', selector)
                     logging.info(f"  ✓ Clicked Export (selector: {selector})")
                     break
             except:
@@ -339,12 +416,13 @@ def export_single_thread(page, thread):
         ]
 
         markdown_clicked = False
-        for selector in markdown_selectors:
+        for selector in SELECTOR_CACHE.ranked('markdown', markdown_selectors):
             try:
                 md_btn = page.locator(selector).first
                 if md_btn.is_visible(timeout=2000):
                     md_btn.click()
                     markdown_clicked = True
+                    SELECTOR_CACHE.record('markdown', selector)
                     logging.info(f"  ✓ Selected Markdown (selector: {selector})")
                     break
             except:
@@ -362,12 +440,13 @@ def export_single_thread(page, thread):
                     'text=/txt/i',
                     'text="Plain text"'
                 ]
-                for selector in text_selectors:
+                for selector in SELECTOR_CACHE.ranked('text', text_selectors):
                     try:
                         txt_btn = page.locator(selector).first
                         if txt_btn.is_visible(timeout=2000):
                             txt_btn.click()
                             markdown_clicked = True  # Use same flag since we got something
+                            SELECTOR_CACHE.record('text', selector)
                             logging.info(f"  ✓ Selected Text format as fallback (selector: {selector})")
                             break
                     except:
@@ -426,10 +505,247 @@ def export_single_thread(page, thread):
         logging.error(f"  ❌ Exception: {error_msg}")
         return False, error_msg, None
 
-def process_bulk_export(limit=None):
+class PolitenessLimiter:
+    """Global spacing between thread exports across all workers"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until this caller's slot comes up"""
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds):
+        """Push every worker's next slot back (batch breaks)"""
+        with self.lock:
+            self.next_slot = max(self.next_slot, time.time()) + seconds
+
+def export_worker(worker_id, work_queue, results, limiter, stop_event):
+    """
+    Parallel export worker: own browser + context (shared saved login),
+    pulls threads from work_queue and reports to results; never writes status
+    """
+    try:
+        with sync_playwright() as p:
+            browser = getattr(p, CONFIG['browser']).launch(headless=False)
+            context = browser.new_context(storage_state=CONFIG['auth_state_file'])
+            context.set_default_timeout(CONFIG['timeout_ms'])
+            if CONFIG['block_resources']:
+                apply_route_profile(context, CONFIG['route_profile'])
+
+            while not stop_event.is_set():
+                try:
+                    thread = work_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                limiter.wait()
+                logging.info(f"[worker {worker_id}] → {thread['title'][:60]} ({thread['thread_id']})")
+                page = context.new_page()
+                try:
+                    success, error, file_path = export_single_thread(page, thread)
+                except Exception as e:
+                    success, error, file_path = False, f"Unexpected error: {str(e)[:150]}", None
+                finally:
+                    try:
+                        page.close()
+                    except:
+                        pass
+
+                results.put((worker_id, thread, success, error, file_path))
+
+            browser.close()
+    except Exception as e:
+        logging.error(f"[worker {worker_id}] ❌ Worker crashed: {str(e)[:200]}")
+    finally:
+        results.put(None)  # Worker finished
+
+def run_parallel_export(pending, workers):
+    """
+    Export pending threads with N isolated browser contexts
+    Workers share one pending queue and a global politeness limiter; this
+    thread is the single writer of the status journal
+    Returns: (success_count, failure_count)
+    """
+    total = len(pending)
+    work_queue = queue.Queue()
+    for _, thread in pending.iterrows():
+        work_queue.put(thread)
+
+    results = queue.Queue()
+    limiter = PolitenessLimiter(CONFIG['delay_seconds'])
+    stop_event = threading.Event()
+    workers = min(workers, total)
+
+    logging.info(f"🚀 Starting {workers} parallel export workers")
+    threads = [
+        threading.Thread(target=export_worker, args=(n, work_queue, results, limiter, stop_event),
+                         name=f'export-worker-{n}', daemon=True)
+        for n in range(1, workers + 1)
+    ]
+    for t in threads:
+        t.start()
+
+    success_count = 0
+    failure_count = 0
+    done = 0
+    running = workers
+
+    try:
+        while running:
+            item = results.get()
+            if item is None:
+                running -= 1
+                continue
+
+            worker_id, thread, success, error, file_path = item
+            done += 1
+            update_thread_status(thread['thread_id'], success, error, file_path)
+
+            if success:
+                success_count += 1
+                logging.info(f"  ✅ [worker {worker_id}] SUCCESS: Exported to {file_path}")
+            else:
+                failure_count += 1
+                logging.warning(f"  ❌ [worker {worker_id}] FAILED: {error}")
+
+            print_progress_bar(done, total, success_count, failure_count)
+            refresh_inventory()
+
+            # Batch break: hold every worker's next slot
+            if done % CONFIG['batch_size'] == 0 and done < total:
+                logging.info("\n" + "*"*80)
+                logging.info(f"BATCH CHECKPOINT: {done} threads processed")
+                logging.info(f"Success: {success_count} | Failed: {failure_count}")
+                logging.info(f"Pausing all workers for {CONFIG['batch_break_seconds']} seconds...")
+                logging.info("*"*80 + "\n")
+                limiter.pause(CONFIG['batch_break_seconds'])
+    except KeyboardInterrupt:
+        logging.warning("Interrupted - letting workers finish their current thread...")
+        stop_event.set()
+        while running:
+            item = results.get()
+            if item is None:
+                running -= 1
+            else:
+                _, thread, success, error, file_path = item
+                update_thread_status(thread['thread_id'], success, error, file_path)
+        raise
+
+    for t in threads:
+        t.join()
+
+    return success_count, failure_count
+
+def run_async_engine(pending, workers):
+    """
+    Export with the asyncio engine (perplexity_async_export)
+    Status is written from the event loop's single result consumer
+    Returns: (success_count, failure_count)
+    """
+    from perplexity_async_export import run_async_export
+
+    counts = {'success': 0, 'failed': 0}
+
+    def record_result(done, total, thread, success, error, file_path):
+        update_thread_status(thread['thread_id'], success, error, file_path)
+        counts['success' if success else 'failed'] += 1
+        print_progress_bar(done, total, counts['success'], counts['failed'])
+        refresh_inventory()
+
+    return asyncio.run(run_async_export(pending, CONFIG, workers, record_result, browser_type=CONFIG['browser']))
+
+def run_accounts_async(accounts, workers, limit=None, profiles_file=PROFILES_FILE):
+    """
+    Export several account profiles at the same time on one event loop
+    Each account gets its own browser contexts (own login, inventory, journal,
+    export dir, pacing and log file) - an even share of --workers of them -
+    and all pages share one --workers budget, so total time is that of the
+    slowest account
+    """
+    from perplexity_async_export import run_async_export, account_logger
+
+    jobs = []
+    for name in accounts:
+        config = load_account_profile(name, profiles_file)
+        log = account_logger(config)
+        add_log_file(config['log_file'], log)
+        if not os.path.exists(config['csv_path']):
+            log.error(f"❌ [{name}] CSV file not found: {config['csv_path']} (run --extract)")
+            continue
+        if not os.path.exists(config['auth_state_file']):
+            log.error(f"❌ [{name}] No saved authentication - run --account {name} --test once first")
+            continue
+
+        materialize_inventory(config)
+        df = load_inventory(config)
+        pending = df[df['completed'] == False].copy()
+        if limit:
+            pending = pending.head(limit)
+        if len(pending) == 0:
+            log.info(f"✅ [{name}] No pending threads to export")
+            continue
+
+        os.makedirs(config['export_dir'], exist_ok=True)
+        log.info(f"📊 [{name}] {config['label']}: {len(pending)} pending of {len(df)} threads "
+                     f"→ {config['export_dir']}")
+        jobs.append((config, pending))
+
+    if not jobs:
+        return
+
+    def recorder(config):
+        def record_result(done, total, thread, success, error, file_path):
+            update_thread_status(thread['thread_id'], success, error, file_path, config=config)
+            refresh_inventory(config)
+        return record_result
+
+    # Split --workers between the accounts instead of opening that many contexts
+    # per account; the shared budget keeps the total of open pages at --workers
+    per_account = max(1, workers // len(jobs))
+
+    async def run_all():
+        budget = asyncio.Semaphore(workers)
+        return await asyncio.gather(*[
+            run_async_export(pending, config, per_account, recorder(config), browser_type=config['browser'],
+                             budget=budget)
+            for config, pending in jobs
+        ], return_exceptions=True)
+
+    started = time.time()
+    try:
+        results = asyncio.run(run_all())
+    finally:
+        for config, _ in jobs:
+            materialize_inventory(config)
+
+    logging.info("\n" + "="*80)
+    logging.info(f"MULTI-ACCOUNT EXPORT COMPLETE ({(time.time() - started) / 60:.1f} min)")
+    logging.info("="*80)
+    for (config, pending), result in zip(jobs, results):
+        if isinstance(result, Exception):
+            account_logger(config).error(f"  ❌ [{config['account']}] Export aborted: {str(result)[:200]}")
+        else:
+            success_count, failure_count = result
+            account_logger(config).info(f"  [{config['account']}] Successful: {success_count}/{len(pending)} | Failed: {failure_count}")
+
+    for config, _ in jobs:
+        print(f"\n{config['label']}:")
+        print_progress_report(config)
+
+def process_bulk_export(limit=None, workers=1, engine='sync'):
     """
     Phase 2/3: Export threads with progress tracking
     limit: If set, only process this many threads (for testing)
+    workers: Number of parallel browser contexts (1 = sequential)
+    engine: 'sync' (threads) or 'async' (concurrent pages on one event loop)
     """
 
     # Verify CSV exists
@@ -438,11 +754,9 @@ def process_bulk_export(limit=None):
         logging.error("Please run with --extract first to create the CSV")
         return
 
-    # Load pending threads
-    df = pd.read_csv(CONFIG['csv_path'])
-
-    # Convert completed column to boolean if needed
-    df['completed'] = df['completed'].astype(str).str.lower() == 'true'
+    # Load pending threads (CSV + status journal)
+    materialize_inventory()
+    df = load_inventory()
 
     pending = df[df['completed'] == False].copy()
 
@@ -468,121 +782,140 @@ def process_bulk_export(limit=None):
     logging.info(f"  Already completed: {len(df) - total}")
     logging.info(f"  Pending: {total}")
     logging.info(f"\n📂 Export directory: {CONFIG['export_dir']}")
-    logging.info(f"📈 Dashboard: Open perplexity_dashboard.html and load thread_inventory-personal.csv")
-    logging.info(f"   (Dashboard will auto-refresh every 5 seconds)\n")
+    logging.info(f"📈 Dashboard: Open perplexity_dashboard.html and load {os.path.basename(CONFIG['csv_path'])}")
+    logging.info(f"   (CSV is refreshed every {CONFIG['materialize_seconds'] // 60} min and at the end; --report is always current)\n")
+
+    if (workers > 1 or engine == 'async') and not os.path.exists(CONFIG['auth_state_file']):
+        logging.error("❌ Parallel/async export needs saved authentication")
+        logging.error("   Run --test once (single worker) to log in first")
+        return
 
     # Create export directory
     os.makedirs(CONFIG['export_dir'], exist_ok=True)
 
-    # Start export process
-    with sync_playwright() as p:
-        # Try Firefox - better at bypassing Cloudflare
-        browser = p.firefox.launch(
-            headless=False  # Set to True for unattended runs
-        )
-
-        # Check for saved authentication state
-        auth_state_exists = os.path.exists(CONFIG['auth_state_file'])
-
-        if auth_state_exists:
-            logging.info("✓ Using saved authentication state")
-            # Load persistent auth state - keeps login between sessions
-            context = browser.new_context(storage_state=CONFIG['auth_state_file'])
-        else:
-            logging.info("⚠️  No saved authentication found")
-            logging.info("   Opening Perplexity for login...")
-
-            # Create temporary context for login
-            context = browser.new_context()
-            page = context.new_page()
-            page.goto('https://www.perplexity.ai')
-
-            logging.info("\n" + "="*80)
-            logging.info("🔐 PLEASE LOG IN TO PERPLEXITY")
-            logging.info("="*80)
-            logging.info("  1. Log in using your preferred method")
-            logging.info("  2. Wait until you see the Perplexity homepage")
-            logging.info("  3. Script will automatically continue in 60 seconds")
-            logging.info("="*80 + "\n")
-
-            # Wait for user to log in
-            time.sleep(60)
-
-            # Save authentication state for future use
-            context.storage_state(path=CONFIG['auth_state_file'])
-            logging.info("✅ Authentication saved for future runs\n")
-
-            page.close()
-
-        # Set default timeout for all operations
-        context.set_default_timeout(CONFIG['timeout_ms'])
-
-        success_count = 0
-        failure_count = 0
+    if engine == 'async':
+        success_count, failure_count = run_async_engine(pending, workers)
+    elif workers > 1:
+        success_count, failure_count = run_parallel_export(pending, workers)
+    else:
+        # Start export process (single browser, one thread at a time)
+        with sync_playwright() as p:
+            browser = getattr(p, CONFIG['browser']).launch(
+                headless=False  # Set to True for unattended runs
+            )
+
+            # Check for saved authentication state
+            auth_state_exists = os.path.exists(CONFIG['auth_state_file'])
+
+            if auth_state_exists:
+                logging.info("✓ Using saved authentication state")
+                # Load persistent auth state - keeps login between sessions
+                context = browser.new_context(storage_state=CONFIG['auth_state_file'])
+            else:
+                logging.info("⚠️  No saved authentication found")
+                logging.info("   Opening Perplexity for login...")
+
+                # Create temporary context for login
+                context = browser.new_context()
+                page = context.new_page()
+                page.goto('https://www.perplexity.ai')
+
+                logging.info("\n" + "="*80)
+                logging.info("🔐 PLEASE LOG IN TO PERPLEXITY")
+                logging.info("="*80)
+                logging.info("  1. Log in using your preferred method")
+                logging.info("  2. Wait until you see the Perplexity homepage")
+                logging.info("  3. Script will automatically continue in 60 seconds")
+                logging.info("="*80 + "\n")
+
+                # Wait for user to log in
+                time.sleep(60)
+
+                # Save authentication state for future use
+                context.storage_state(path=CONFIG['auth_state_file'])
+                logging.info("✅ Authentication saved for future runs\n")
+
+                page.close()
+
+            # Set default timeout for all operations
+            context.set_default_timeout(CONFIG['timeout_ms'])
+
+            # Skip heavy resources the export doesn't need
+            route_stats = apply_route_profile(context, CONFIG['route_profile']) if CONFIG['block_resources'] else None
+
+            success_count = 0
+            failure_count = 0
+
+            for i, (idx, thread) in enumerate(pending.iterrows(), 1):
+                # Progress header
+                logging.info("\n" + "="*80)
+                logging.info(f"THREAD {i}/{total} ({i/total*100:.1f}%)")
+                logging.info(f"Title: {thread['title'][:70]}")
+                logging.info(f"ID: {thread['thread_id']}")
+                logging.info("="*80)
+
+                # Create fresh page (important for isolation)
+                page = context.new_page()
 
-        for i, (idx, thread) in enumerate(pending.iterrows(), 1):
-            # Progress header
-            logging.info("\n" + "="*80)
-            logging.info(f"THREAD {i}/{total} ({i/total*100:.1f}%)")
-            logging.info(f"Title: {thread['title'][:70]}")
-            logging.info(f"ID: {thread['thread_id']}")
-            logging.info("="*80)
+                try:
+                    # Export the thread
+                    success, error, file_path = export_single_thread(page, thread)
 
-            # Create fresh page (important for isolation)
-            page = context.new_page()
+                    # Journal status immediately (CSV is materialized at the end)
+                    update_thread_status(thread['thread_id'], success, error, file_path)
 
-            try:
-                # Export the thread
-                success, error, file_path = export_single_thread(page, thread)
+                    if success:
+                        success_count += 1
+                        logging.info(f"  ✅ SUCCESS: Exported to {file_path}")
+                    else:
+                        failure_count += 1
+                        logging.warning(f"  ❌ FAILED: {error}")
 
-                # Update CSV immediately (dashboard will pick this up)
-                update_thread_status(thread['thread_id'], success, error, file_path)
+                    # Update progress bar after each thread
+                    print_progress_bar(i, total, success_count, failure_count)
 
-                if success:
-                    success_count += 1
-                    logging.info(f"  ✅ SUCCESS: Exported to {file_path}")
-                else:
+                except Exception as e:
                     failure_count += 1
-                    logging.warning(f"  ❌ FAILED: {error}")
+                    error_msg = f"Unexpected error: {str(e)[:150]}"
+                    logging.error(f"  ❌ {error_msg}")
+                    update_thread_status(thread['thread_id'], False, error_msg)
 
-                # Update progress bar after each thread
-                print_progress_bar(i, total, success_count, failure_count)
+                    # Update progress bar even on exception
+                    print_progress_bar(i, total, success_count, failure_count)
 
-            except Exception as e:
-                failure_count += 1
-                error_msg = f"Unexpected error: {str(e)[:150]}"
-                logging.error(f"  ❌ {error_msg}")
-                update_thread_status(thread['thread_id'], False, error_msg)
+                finally:
+                    # Always close page (prevents memory/resource buildup)
+                    try:
+                        page.close()
+                    except:
+                        pass
 
-                # Update progress bar even on exception
-                print_progress_bar(i, total, success_count, failure_count)
+                refresh_inventory()
 
-            finally:
-                # Always close page (prevents memory/resource buildup)
-                try:
-                    page.close()
-                except:
-                    pass
+                # Rate limiting - respectful delay
+                if i < total:  # Don't delay after last thread
+                    time.sleep(CONFIG['delay_seconds'])
 
-            # Rate limiting - respectful delay
-            if i < total:  # Don't delay after last thread
-                time.sleep(CONFIG['delay_seconds'])
+                # Batch break logic
+                if i % CONFIG['batch_size'] == 0 and i < total:
+                    logging.info("\n" + "*"*80)
+                    logging.info(f"BATCH CHECKPOINT: {i} threads processed")
+                    logging.info(f"Success: {success_count} | Failed: {failure_count}")
+                    logging.info(f"Taking {CONFIG['batch_break_seconds']} second break...")
+                    logging.info("Check the dashboard for current progress!")
+                    logging.info("*"*80 + "\n")
 
-            # Batch break logic
-            if i % CONFIG['batch_size'] == 0 and i < total:
-                logging.info("\n" + "*"*80)
-                logging.info(f"BATCH CHECKPOINT: {i} threads processed")
-                logging.info(f"Success: {success_count} | Failed: {failure_count}")
-                logging.info(f"Taking {CONFIG['batch_break_seconds']} second break...")
-                logging.info("Check the dashboard for current progress!")
-                logging.info("*"*80 + "\n")
+                    time.sleep(CONFIG['batch_break_seconds'])
 
-                time.sleep(CONFIG['batch_break_seconds'])
+                    # Mini progress report
+                    print_progress_report()
 
-                # Mini progress report
-                print_progress_report()
+            if route_stats:
+                logging.info(f"🚫 Blocked {route_stats['blocked']} heavy/tracker requests ({route_stats['allowed']} allowed)")
 
-        browser.close()
+            browser.close()
+
+    materialize_inventory()
 
     # Final report
     logging.info("\n" + "="*80)
@@ -621,16 +954,15 @@ def print_progress_bar(current, total, success, failed, prefix='Export Progress'
         print()  # New line for batch milestone
 
 
-def print_progress_report():
+def print_progress_report(config=None):
     """Display current progress statistics"""
-    if not os.path.exists(CONFIG['csv_path']):
-        logging.error(f"CSV file not found: {CONFIG['csv_path']}")
+    config = config or CONFIG
+    if not os.path.exists(config['csv_path']):
+        logging.error(f"CSV file not found: {config['csv_path']}")
         return
 
-    df = pd.read_csv(CONFIG['csv_path'])
-
-    # Convert completed to boolean
-    df['completed'] = df['completed'].astype(str).str.lower() == 'true'
+    # Read through the journal so the report is current mid-export
+    df = load_inventory(config)
 
     total = len(df)
     completed = df['completed'].sum()
@@ -680,6 +1012,10 @@ def print_progress_report():
             print(f"  • {title}")
             print(f"    Error: {error}\n")
 
+def raise_interrupt(signum, frame):
+    """SIGTERM → KeyboardInterrupt, so a killed run folds its journal like Ctrl-C"""
+    raise KeyboardInterrupt
+
 def main():
     """Main entry point with CLI argument parsing"""
     parser = argparse.ArgumentParser(
@@ -690,28 +1026,82 @@ Examples:
   python perplexity_exporter.py --extract    # Extract thread list from Library
   python perplexity_exporter.py --test       # Test export with 10 threads
   python perplexity_exporter.py --full       # Export all threads
+  python perplexity_exporter.py --full --workers 4  # Export with 4 parallel browsers
+  python perplexity_exporter.py --full --engine async --workers 4  # 4 pages on one event loop
   python perplexity_exporter.py --report     # Show progress report
+  python perplexity_exporter.py --account account2 --full    # Export another profile
+  python perplexity_exporter.py --accounts personal,account2 --full --workers 4  # Both at once
         """
     )
 
     parser.add_argument('--extract', action='store_true',
                        help='Extract thread metadata from Perplexity Library')
+    parser.add_argument('--source', choices=['dom', 'network'], default='dom',
+                       help='--extract source: scrape the DOM or capture Library JSON responses (default: dom)')
     parser.add_argument('--test', action='store_true',
                        help='Test export with first 10 threads')
     parser.add_argument('--full', action='store_true',
                        help='Run full export of all pending threads')
     parser.add_argument('--report', action='store_true',
                        help='Display progress report only')
+    parser.add_argument('--no-block', action='store_true',
+                       help='Load pages fully (disable resource/tracker blocking, for debugging)')
+    parser.add_argument('--workers', '--pages', type=int, default=1, metavar='N',
+                       help='Export with N parallel browser contexts (default: 1); '
+                            'with --accounts, the total page budget shared by all accounts')
+    parser.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                       help='sync: threaded sync_playwright; async: event-driven async_playwright (default: sync)')
+
+    parser.add_argument('--account', default=DEFAULT_ACCOUNT,
+                       help=f'Account profile to use (default: {DEFAULT_ACCOUNT})')
+    parser.add_argument('--accounts', metavar='A,B',
+                       help='Comma-separated profiles to export concurrently (async engine)')
+    parser.add_argument('--profiles', default=PROFILES_FILE, metavar='FILE',
+                       help='Account-profile file (default: perplexity_accounts.json)')
 
     args = parser.parse_args()
 
+    if args.no_block:
+        CONFIG['block_resources'] = False
+
+    signal.signal(signal.SIGTERM, raise_interrupt)
+
+    accounts = [a.strip() for a in (args.accounts or args.account).split(',') if a.strip()]
+    for name in accounts:
+        try:
+            load_account_profile(name, args.profiles)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(str(e))
+
+    if len(accounts) > 1:
+        if args.test or args.full:
+            run_accounts_async(accounts, max(args.workers, len(accounts)),
+                               limit=10 if args.test else None, profiles_file=args.profiles)
+        elif args.report:
+            for name in accounts:
+                config = load_account_profile(name, args.profiles)
+                print(f"\n{config['label']}:")
+                print_progress_report(config)
+        elif args.extract:
+            # Extraction may need an interactive login, so accounts run one at a time
+            for name in accounts:
+                use_account(name, args.profiles)
+                extract_thread_metadata(source=args.source)
+        else:
+            parser.print_help()
+        return
+
+    use_account(accounts[0], args.profiles)
+
     # Execute based on arguments
     if args.extract:
-        extract_thread_metadata()
-    elif args.test:
-        process_bulk_export(limit=10)
-    elif args.full:
-        process_bulk_export()
+        extract_thread_metadata(source=args.source)
+    elif args.test or args.full:
+        try:
+            process_bulk_export(limit=10 if args.test else None, workers=args.workers, engine=args.engine)
+        finally:
+            # Also on Ctrl-C / SIGTERM: fold the status journal into the CSV
+            materialize_inventory()
     elif args.report:
         print_progress_report()
     else:
@@ -0,0 +1,112 @@
+"""
+Request Interception Profile for Perplexity Exports
+Aborts heavy and irrelevant requests (images, media, fonts, third-party
+trackers) via context.route so thread pages load faster and use less
+bandwidth. Documents, scripts, stylesheets and XHR/fetch are kept - the
+thread content and the Export menu need them - and Cloudflare's challenge
+scripts are never blocked.
+
+The profile is configurable: pass overrides (e.g. CONFIG['route_profile'] or
+an account's "route_profile" entry) and each key given replaces that key of
+DEFAULT_PROFILE.
+
+Usage:
+  from route_profile import apply_route_profile, apply_route_profile_async
+
+  stats = apply_route_profile(context)                 # sync_playwright
+  stats = await apply_route_profile_async(context)     # async_playwright
+  stats = apply_route_profile(context, {'resource_types': ['media', 'font']})
+"""
+
+from urllib.parse import urlsplit
+
+DEFAULT_PROFILE = {
+    # Playwright request.resource_type values to abort
+    'resource_types': ['image', 'media', 'font'],
+    # Hosts (or their subdomains) to abort regardless of type
+    'block_hosts': [
+        'google-analytics.com',
+        'googletagmanager.com',
+        'doubleclick.net',
+        'segment.io',
+        'segment.com',
+        'sentry.io',
+        'datadoghq.com',
+        'browser-intake-datadoghq.com',
+        'intercom.io',
+        'intercomcdn.com',
+        'hotjar.com',
+        'mixpanel.com',
+        'amplitude.com',
+        'facebook.net',
+        'connect.facebook.net',
+        'singular.net',
+        'cloudflareinsights.com',
+    ],
+    # Hosts that are always allowed (login / bot checks)
+    'allow_hosts': [
+        'challenges.cloudflare.com',
+    ],
+}
+
+def merge_profile(overrides=None):
+    """
+    DEFAULT_PROFILE with overrides' keys replacing the defaults
+    Raises ValueError for keys the profile doesn't have
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f"Unknown route profile keys: {', '.join(sorted(unknown))}")
+    profile = {key: list(values) for key, values in DEFAULT_PROFILE.items()}
+    for key, values in overrides.items():
+        profile[key] = [str(value).lower() for value in values]
+    return profile
+
+def _host_matches(host, domains):
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+def should_block(request, profile=DEFAULT_PROFILE):
+    """Decide whether a request is aborted under profile"""
+    host = (urlsplit(request.url).hostname or '').lower()
+    if _host_matches(host, profile['allow_hosts']):
+        return False
+    if request.resource_type in profile['resource_types']:
+        return True
+    return _host_matches(host, profile['block_hosts'])
+
+def apply_route_profile(context, profile=None):
+    """
+    Route every request of a sync BrowserContext through the profile
+    profile: overrides merged over DEFAULT_PROFILE (see merge_profile)
+    Returns: stats dict {'blocked': n, 'allowed': n}, updated live
+    """
+    profile = merge_profile(profile)
+    stats = {'blocked': 0, 'allowed': 0}
+
+    def handle(route):
+        if should_block(route.request, profile):
+            stats['blocked'] += 1
+            route.abort()
+        else:
+            stats['allowed'] += 1
+            route.continue_()
+
+    context.route('**/*', handle)
+    return stats
+
+async def apply_route_profile_async(context, profile=None):
+    """Async (async_playwright) variant of apply_route_profile"""
+    profile = merge_profile(profile)
+    stats = {'blocked': 0, 'allowed': 0}
+
+    async def handle(route):
+        if should_block(route.request, profile):
+            stats['blocked'] += 1
+            await route.abort()
+        else:
+            stats['allowed'] += 1
+            await route.continue_()
+
+    await context.route('**/*', handle)
+    return stats
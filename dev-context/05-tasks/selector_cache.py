@@ -0,0 +1,64 @@
+"""
+Adaptive Selector Cache
+Learns which selector wins at each export step and tries it first next time
+
+Each step (content, export button, markdown option, ...) remembers its last
+winning selector and a win count per selector. ranked() returns the full
+candidate list with the last winner first and other past winners next, so a
+page change is picked up after one miss and a miss still falls back to every
+selector. Stats are persisted to a small JSON file between runs.
+
+Usage:
+  cache = SelectorCache('selector_cache.json')
+  for selector in cache.ranked('export', export_selectors):
+      if try_selector(selector):
+          cache.record('export', selector)
+          break
+"""
+
+import json
+import os
+import threading
+import logging
+
+class SelectorCache:
+    """Per-step selector wins, persisted as JSON (thread-safe)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.steps = {}
+        try:
+            with open(path) as f:
+                self.steps = json.load(f)
+        except (OSError, ValueError):
+            self.steps = {}
+
+    def ranked(self, step, selectors):
+        """
+        Full selector list, best first: the most recent winner, then by win
+        count (ties keep the original order)
+        """
+        with self.lock:
+            stats = self.steps.get(step, {})
+            last = stats.get('last')
+            wins = dict(stats.get('wins', {}))
+        order = {selector: i for i, selector in enumerate(selectors)}
+        return sorted(selectors, key=lambda s: (s != last, -wins.get(s, 0), order[s]))
+
+    def record(self, step, selector):
+        """Count a win for selector at step and persist"""
+        with self.lock:
+            stats = self.steps.setdefault(step, {'last': None, 'wins': {}})
+            stats['last'] = selector
+            stats['wins'][selector] = stats['wins'].get(selector, 0) + 1
+            self._save()
+
+    def _save(self):
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.steps, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not save selector cache: {e}")
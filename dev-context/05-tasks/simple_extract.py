@@ -4,9 +4,10 @@ Just keeps browser open for 5 minutes - log in and navigate to Library
 """
 
 from playwright.sync_api import sync_playwright
-import pandas as pd
 import time
 
+from thread_inventory import new_inventory, save_inventory
+
 CSV_PATH = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/thread_inventory.csv'
 
 print("="*80)
@@ -105,17 +106,8 @@ if not threads or len(threads) == 0:
     print("   Were you logged in and on the Library page?")
     exit(1)
 
-df = pd.DataFrame(threads)
-df['thread_id'] = df['link'].str.extract(r'/search/([^/?#]+)')
-df['completed'] = False
-df['error'] = ''
-df['export_timestamp'] = ''
-df['file_path'] = ''
-
-df = df.drop_duplicates(subset=['thread_id'], keep='first')
-df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
-
-df.to_csv(CSV_PATH, index=False)
+df = new_inventory(threads)
+df = save_inventory(df, CSV_PATH)
 
 print(f"\n✅ SUCCESS: Extracted {len(df)} threads")
 print(f"📄 Saved to: {CSV_PATH}")
@@ -7,10 +7,11 @@ Improved Perplexity Thread Extractor - ACCOUNT 2
 """
 
 from playwright.sync_api import sync_playwright
-import pandas as pd
 import time
 import os
 
+from thread_inventory import new_inventory, save_inventory
+
 CSV_PATH = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/thread_inventory_account2.csv'
 AUTH_STATE_FILE = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/perplexity_auth_state_account2.json'
 
@@ -155,31 +156,12 @@ if not threads or len(threads) == 0:
     print("   Were you logged in and on the Library page?")
     exit(1)
 
-df = pd.DataFrame(threads)
-df['thread_id'] = df['link'].str.extract(r'/search/([^/?#]+)')
-df['completed'] = False
-df['error'] = ''
-df['export_timestamp'] = ''
-df['file_path'] = ''
-
-df = df.drop_duplicates(subset=['thread_id'], keep='first')
-df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
+df = new_inventory(threads)
 
-# Check if CSV exists and merge with existing data
-import os
+# Merge with the existing CSV (keeps completion status, keyed on thread_id)
 if os.path.exists(CSV_PATH):
     print(f"\n→ Merging with existing Account 2 CSV...")
-    existing_df = pd.read_csv(CSV_PATH)
-
-    # Keep completion status from existing threads
-    for idx, row in existing_df.iterrows():
-        if row['thread_id'] in df['thread_id'].values:
-            df.loc[df['thread_id'] == row['thread_id'], 'completed'] = row['completed']
-            df.loc[df['thread_id'] == row['thread_id'], 'error'] = row['error']
-            df.loc[df['thread_id'] == row['thread_id'], 'export_timestamp'] = row['export_timestamp']
-            df.loc[df['thread_id'] == row['thread_id'], 'file_path'] = row['file_path']
-
-df.to_csv(CSV_PATH, index=False)
+df = save_inventory(df, CSV_PATH)
 
 print(f"\n✅ SUCCESS: Extracted {len(df)} threads from Account 2")
 print(f"📄 Saved to: {CSV_PATH}")
@@ -1,15 +1,17 @@
 """
 Improved Perplexity Thread Extractor
 - No viewport restrictions (mobile responsive)
-- Much more aggressive scrolling (30+ scrolls)
-- Longer wait times for full library load
+- Scrolls until the Library stops growing (convergence detection)
+- Captures rows a virtualized list removes from the DOM
 """
 
 from playwright.sync_api import sync_playwright
-import pandas as pd
 import time
 import os
 
+from library_harvester import harvest_library
+from thread_inventory import new_inventory, save_inventory
+
 CSV_PATH = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/thread_inventory.csv'
 AUTH_STATE_FILE = '/Users/christophercooper/Dropbox/CC Projects/yellowcircle/yellow-circle/dev-context/05-tasks/perplexity_auth_state.json'
 
@@ -22,8 +24,8 @@ print("IMPROVEMENTS:")
 print("="*80)
 print("""
 ✓ Responsive browser (no fixed viewport)
-✓ Aggressive scrolling (30+ scrolls to load all threads)
-✓ Longer wait times for content loading
+✓ Scrolls until no new threads appear (seconds for small libraries)
+✓ MutationObserver keeps threads a virtualized list unloads
 ✓ Better thread detection
 
 WHAT WILL HAPPEN:
@@ -31,7 +33,7 @@ WHAT WILL HAPPEN:
 2. You have 5 MINUTES to:
    - Log in
    - Navigate to Library
-3. Script will scroll 30+ times to load ALL threads
+3. Script scrolls until ALL threads are loaded
 4. Extracts all discovered threads
 5. Updates CSV with complete thread list
 """)
@@ -100,48 +102,9 @@ with sync_playwright() as p:
 
     time.sleep(3)
 
-    # EXTREME AGGRESSIVE SCROLLING - for FULL thread list to hermit thread endpoint
-    print("→ EXTREME aggressive scrolling to load ALL threads to hermit endpoint...")
-    print("   (This will take about 10 minutes - 200 scrolls)")
-
-    for i in range(200):
-        # Scroll to bottom
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(3)  # 3 seconds between each scroll for full loading
-
-        if (i + 1) % 20 == 0:
-            print(f"   Scroll {i+1}/200... (loading more threads)")
-
-    # Final wait for any lazy-loaded content
-    print("→ Waiting for final content to load...")
-    time.sleep(15)
-
-    # Extract
-    print("→ Extracting threads...")
-    threads = page.evaluate("""
-        () => {
-            const threads = [];
-            const searchLinks = document.querySelectorAll('a[href*="/search/"]');
-
-            console.log('Found search links:', searchLinks.length);
-
-            searchLinks.forEach(el => {
-                const link = el.href;
-                let title = el.textContent?.trim().replace(/\\s+/g, ' ') || '';
-
-                if (title.length > 200) title = title.substring(0, 200);
-
-                const dateEl = el.querySelector('time') || el.querySelector('[class*="date"]');
-                const date = dateEl?.textContent?.trim() || dateEl?.getAttribute('datetime') || '';
-
-                if (link && title.length > 0) {
-                    threads.push({ title, link, date });
-                }
-            });
-
-            return threads;
-        }
-    """)
+    # Scroll until the Library stops growing - observer also keeps rows
+    # a virtualized list drops from the DOM
+    threads = harvest_library(page)
 
     browser.close()
 
@@ -151,31 +114,12 @@ if not threads or len(threads) == 0:
     print("   Were you logged in and on the Library page?")
     exit(1)
 
-df = pd.DataFrame(threads)
-df['thread_id'] = df['link'].str.extract(r'/search/([^/?#]+)')
-df['completed'] = False
-df['error'] = ''
-df['export_timestamp'] = ''
-df['file_path'] = ''
-
-df = df.drop_duplicates(subset=['thread_id'], keep='first')
-df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
+df = new_inventory(threads)
 
-# Check if CSV exists and merge with existing data
-import os
+# Merge with the existing CSV (keeps completion status, keyed on thread_id)
 if os.path.exists(CSV_PATH):
     print(f"\n→ Merging with existing CSV...")
-    existing_df = pd.read_csv(CSV_PATH)
-
-    # Keep completion status from existing threads
-    for idx, row in existing_df.iterrows():
-        if row['thread_id'] in df['thread_id'].values:
-            df.loc[df['thread_id'] == row['thread_id'], 'completed'] = row['completed']
-            df.loc[df['thread_id'] == row['thread_id'], 'error'] = row['error']
-            df.loc[df['thread_id'] == row['thread_id'], 'export_timestamp'] = row['export_timestamp']
-            df.loc[df['thread_id'] == row['thread_id'], 'file_path'] = row['file_path']
-
-df.to_csv(CSV_PATH, index=False)
+df = save_inventory(df, CSV_PATH)
 
 print(f"\n✅ SUCCESS: Extracted {len(df)} threads")
 print(f"📄 Saved to: {CSV_PATH}")
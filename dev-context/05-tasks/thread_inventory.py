@@ -0,0 +1,111 @@
+"""
+Thread Inventory
+Shared build / merge / save for the thread inventory CSV used by every extractor
+
+A re-scrape is merged into the existing CSV with one thread_id-indexed join
+instead of a row-by-row loop, so keeping export progress across re-extractions
+takes milliseconds even at tens of thousands of threads.
+
+Merge rules (thread_id is the key):
+  - Status columns (completed, error, export_timestamp, file_path): the
+    existing CSV wins - a scrape never knows export progress
+  - Metadata columns (title, link, date, ...): the new scrape wins, unless its
+    value is blank, then the existing value is kept
+  - Threads missing from the new scrape are kept (after the scraped ones), so
+    a short scroll never loses progress; pass keep_missing=False to drop them
+  - Duplicate IDs: first row of the scrape, last row of the existing CSV
+
+Usage:
+  from thread_inventory import new_inventory, save_inventory
+
+  df = new_inventory(threads)          # threads: [{'title', 'link', 'date'}, ...]
+  df = save_inventory(df, CSV_PATH)    # merges with CSV_PATH if it exists
+"""
+
+import os
+
+import pandas as pd
+
+STATUS_COLUMNS = ['completed', 'error', 'export_timestamp', 'file_path']
+THREAD_ID_PATTERN = r'/search/([^/?#]+)'
+
+def new_inventory(threads, id_patterns=(THREAD_ID_PATTERN,)):
+    """
+    Build an inventory DataFrame from scraped thread dicts
+    thread_id comes from the records if present, otherwise from the first of
+    id_patterns that matches any link. Rows without an ID are dropped.
+    """
+    df = pd.DataFrame(threads)
+    if df.empty:
+        return pd.DataFrame(columns=['title', 'link', 'date', 'thread_id'] + STATUS_COLUMNS)
+
+    if 'thread_id' not in df.columns:
+        for pattern in id_patterns:
+            df['thread_id'] = df['link'].str.extract(pattern, expand=False)
+            if df['thread_id'].notna().any():
+                break
+
+    df['completed'] = False
+    df['error'] = ''
+    df['export_timestamp'] = ''
+    df['file_path'] = ''
+
+    df = df[df['thread_id'].notna() & (df['thread_id'] != '')]
+    return df.drop_duplicates(subset=['thread_id'], keep='first').reset_index(drop=True)
+
+def _blank(series):
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+def merge_inventory(scraped, existing, keep_missing=True):
+    """
+    Merge a fresh scrape with an existing inventory (see module docstring)
+    Returns: (merged DataFrame, stats dict {'scraped', 'matched', 'new', 'missing'})
+    """
+    columns = list(scraped.columns) + [c for c in existing.columns if c not in scraped.columns]
+    scraped = (scraped[scraped['thread_id'].notna()]
+               .drop_duplicates(subset=['thread_id'], keep='first')
+               .set_index('thread_id'))
+    existing = (existing[existing['thread_id'].notna()]
+                .drop_duplicates(subset=['thread_id'], keep='last')
+                .set_index('thread_id'))
+
+    old = existing.reindex(scraped.index)
+    seen = scraped.index.isin(existing.index)
+
+    merged = scraped.copy()
+    for col in existing.columns:
+        if col not in merged.columns:
+            merged[col] = old[col]
+        elif col in STATUS_COLUMNS:
+            merged[col] = merged[col].mask(seen, old[col])
+        else:
+            merged[col] = merged[col].mask(seen & _blank(merged[col]), old[col])
+
+    missing = existing[~existing.index.isin(scraped.index)]
+    if keep_missing and len(missing):
+        merged = pd.concat([merged, missing[merged.columns.intersection(missing.columns)]])
+
+    stats = {
+        'scraped': len(scraped),
+        'matched': int(seen.sum()),
+        'new': int((~seen).sum()),
+        'missing': len(missing),
+    }
+    return merged.reset_index()[columns], stats
+
+def save_inventory(df, csv_path, keep_missing=True, log=print):
+    """
+    Write df to csv_path, merged with the inventory already there
+    The file is replaced atomically. Returns: the DataFrame written
+    """
+    if os.path.exists(csv_path):
+        existing = pd.read_csv(csv_path, dtype={'thread_id': str})
+        df, stats = merge_inventory(df, existing, keep_missing=keep_missing)
+        kept = 'kept' if keep_missing else 'dropped'
+        log(f"→ Merged with existing inventory: {stats['matched']} known, {stats['new']} new, "
+            f"{stats['missing']} not in this scrape ({kept})")
+
+    tmp_path = csv_path + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, csv_path)
+    return df
@@ -2,31 +2,81 @@
 """
 Claude Relay Daemon - No Human Intervention Bot-to-Bot Communication
 
-Polls Slack for Leads bot messages mentioning @claude, calls Claude API, posts response.
+Watches Slack for Leads bot messages mentioning @claude, calls Claude API, posts response.
+
+Modes:
+    - Polling (default): conversations.history every POLL_INTERVAL, fetching only
+      messages newer than the last seen ts (oldest= cursor)
+    - Socket Mode (when RELAY_SLACK_APP_TOKEN is set and slack-bolt is installed):
+      messages are handled as they arrive, with a catch-up poll on startup and a
+      slow reconcile poll that re-scans the last few minutes as a safety net.
+      RELAY_SLACK_APP_TOKEN must belong to a separate Slack app: Slack delivers
+      each event to only one Socket Mode connection per app, so sharing
+      sleepless-daemon's SLACK_APP_TOKEN would split events between the two
 
 Usage:
     python3 scripts/claude-relay-daemon.py           # Run in foreground
     python3 scripts/claude-relay-daemon.py --daemon  # Run in background
+    python3 scripts/claude-relay-daemon.py --poll    # Force polling mode
+    python3 scripts/claude-relay-daemon.py --serial  # One request at a time (no pipeline)
 
 Requirements:
     - SLACK_BOT_TOKEN in .env
     - ANTHROPIC_API_KEY in .env (get from console.anthropic.com)
+    - Optional: RELAY_SLACK_APP_TOKEN in .env + slack-bolt (for Socket Mode)
 """
 
 import os
 import sys
 import json
 import time
-import urllib.request
+import heapq
+import queue
+import threading
 import urllib.error
+from collections import defaultdict, deque
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_transport import get, post_json
+from llm_cache import LLMCache
+
+# Slack Bolt is optional: without it the daemon falls back to polling
+try:
+    from slack_bolt import App
+    from slack_bolt.adapter.socket_mode import SocketModeHandler
+except ImportError:
+    App = None
+    SocketModeHandler = None
 
 # Configuration
 CHANNEL = 'C09UQGASA2C'
 LEADS_BOT = 'U0A2J4EK753'
 CLAUDE_USER = 'U09TPRV5ZQB'
-POLL_INTERVAL = 10  # seconds
-MAX_PROCESSED = 1000  # Max messages to track
+POLL_INTERVAL = 10  # seconds (polling mode)
+RECONCILE_INTERVAL = 300  # seconds between safety-net polls in Socket Mode
+RECONCILE_OVERLAP = 60  # extra seconds each reconcile re-scans beyond the interval
+HISTORY_PAGE_LIMIT = 100  # messages per conversations.history page when catching up
+RELAY_WORKERS = 4  # concurrent Claude API calls (pipelined mode)
+RELAY_QUEUE_MAX = 50  # pending relay requests before fetching blocks
+SLACK_POST_INTERVAL = 1.0  # seconds between chat.postMessage calls (~1/sec per channel)
+MAX_PROCESSED = 1000  # Max message ts values kept in the dedup window
+CURSOR_SAVE_INTERVAL = 60  # seconds; cursor-only changes are persisted at most this often
+SLACK_READ_RETRIES = 2  # Retries for idempotent Slack reads
+CLAUDE_API_TIMEOUT = 120  # seconds
+CLAUDE_MODEL = 'claude-sonnet-4-5-20250929'
+
+# Response cache (identical relay requests skip the API call)
+STATE_DIR = Path.home() / 'Library' / 'Application Support' / 'yellowcircle' / 'relay'
+LLM_CACHE_FILE = STATE_DIR / 'llm-cache.db'
+PROCESSED_FILE = STATE_DIR / 'processed-messages.json'
+LLM_CACHE_TTL = 86400  # 24 hours
+LLM_CACHE_MAX_ENTRIES = 500
+
+llm_cache = None
+pipeline = None  # RelayPipeline when running pipelined (default)
 
 def load_env():
     """Load environment variables from .env file"""
@@ -42,17 +92,43 @@ def log(message):
     """Print timestamped log message"""
     print(f'[{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}] {message}')
 
-def get_recent_messages(token, channel, limit=20):
-    """Fetch recent messages from Slack channel"""
-    req = urllib.request.Request(
-        f'https://slack.com/api/conversations.history?channel={channel}&limit={limit}',
-        headers={'Authorization': f'Bearer {token}'}
-    )
-    response = urllib.request.urlopen(req)
-    result = json.loads(response.read().decode())
+def get_recent_messages(token, channel, limit=20, oldest=None, cursor=None):
+    """
+    Fetch recent messages from Slack channel.
+    Returns tuple: (messages, next_cursor) - messages are newest first
+    """
+    url = f'https://slack.com/api/conversations.history?channel={channel}&limit={limit}'
+    if oldest:
+        url += f'&oldest={oldest}'
+    if cursor:
+        url += f'&cursor={cursor}'
+    result = get(
+        url,
+        headers={'Authorization': f'Bearer {token}'},
+        retries=SLACK_READ_RETRIES
+    ).json()
     if not result.get('ok'):
         raise Exception(f"Slack API error: {result.get('error')}")
-    return result.get('messages', [])
+    next_cursor = result.get('response_metadata', {}).get('next_cursor') if result.get('has_more') else None
+    return result.get('messages', []), next_cursor
+
+def get_messages_since(token, channel, oldest=None):
+    """
+    Fetch messages newer than oldest (exclusive), oldest first.
+    Without a cursor only the latest page is fetched.
+    """
+    if not oldest:
+        messages, _ = get_recent_messages(token, channel)
+        return list(reversed(messages))
+
+    messages = []
+    cursor = None
+    while True:
+        page, cursor = get_recent_messages(token, channel, HISTORY_PAGE_LIMIT, oldest=oldest, cursor=cursor)
+        messages.extend(page)
+        if not cursor:
+            break
+    return sorted(messages, key=lambda m: float(m.get('ts', 0)))
 
 def call_claude_api(api_key, message, context=None):
     """Call Claude API and return response"""
@@ -71,50 +147,48 @@ Keep responses brief and focused."""
     if context:
         full_message = f"Context:\n{context}\n\nRequest:\n{message}"
 
-    data = json.dumps({
-        'model': 'claude-sonnet-4-5-20250929',
-        'max_tokens': 1024,
-        'system': system_prompt,
-        'messages': [{'role': 'user', 'content': full_message}]
-    }).encode('utf-8')
+    if llm_cache:
+        cached = llm_cache.get(CLAUDE_MODEL, full_message, system=system_prompt)
+        if cached:
+            stats = llm_cache.stats()
+            log(f'  Cache hit ({stats["hits"]} hits / {stats["misses"]} misses)')
+            return cached[0]
 
-    req = urllib.request.Request(
+    result = post_json(
         'https://api.anthropic.com/v1/messages',
-        data=data,
+        {
+            'model': CLAUDE_MODEL,
+            'max_tokens': 1024,
+            'system': system_prompt,
+            'messages': [{'role': 'user', 'content': full_message}]
+        },
         headers={
             'x-api-key': api_key,
-            'anthropic-version': '2023-06-01',
-            'Content-Type': 'application/json'
-        }
-    )
-
-    response = urllib.request.urlopen(req)
-    result = json.loads(response.read().decode())
+            'anthropic-version': '2023-06-01'
+        },
+        timeout=CLAUDE_API_TIMEOUT,
+        retries=1
+    ).json()
 
     if 'content' in result and len(result['content']) > 0:
-        return result['content'][0].get('text', 'No response generated')
+        text = result['content'][0].get('text', 'No response generated')
+        if llm_cache:
+            llm_cache.put(CLAUDE_MODEL, full_message, text, source='anthropic', system=system_prompt)
+        return text
     return 'No response generated'
 
 def post_slack_reply(token, channel, thread_ts, text):
     """Post a reply to Slack, optionally in a thread"""
-    data = json.dumps({
-        'channel': channel,
-        'thread_ts': thread_ts,
-        'text': f'🤖 *Claude Response:*\n\n{text}',
-        'unfurl_links': False
-    }).encode('utf-8')
-
-    req = urllib.request.Request(
+    result = post_json(
         'https://slack.com/api/chat.postMessage',
-        data=data,
-        headers={
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json; charset=utf-8'
-        }
-    )
-
-    response = urllib.request.urlopen(req)
-    result = json.loads(response.read().decode())
+        {
+            'channel': channel,
+            'thread_ts': thread_ts,
+            'text': f'🤖 *Claude Response:*\n\n{text}',
+            'unfurl_links': False
+        },
+        headers={'Authorization': f'Bearer {token}'}
+    ).json()
     if not result.get('ok'):
         raise Exception(f"Slack post error: {result.get('error')}")
     return result
@@ -146,10 +220,270 @@ def extract_message_content(text, claude_user):
     # Clean up
     return content.strip()
 
+class RelayState:
+    """
+    Dedup window and ts cursor shared by the Socket Mode handler and pollers.
+
+    Relayed message ts values are kept bounded at max_entries, evicting the
+    oldest ts first. Evicted entries advance a ts watermark: anything at or
+    below it counts as already seen, so a rollover never re-relays old
+    messages. State is persisted to disk so restarts don't either - on every
+    claim (a relayed message), while cursor-only progress from messages that
+    don't qualify is saved at most every CURSOR_SAVE_INTERVAL.
+    """
+
+    def __init__(self, path=PROCESSED_FILE, max_entries=MAX_PROCESSED):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.processed_messages = set()
+        self._by_ts = []  # min-heap of (float ts, ts) for eviction
+        self.watermark = 0.0  # ts at or below this are treated as processed
+        self.cursor = None  # newest message ts seen
+        self.last_save = 0.0
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load persisted dedup state"""
+        try:
+            if self.path.exists():
+                data = json.loads(self.path.read_text())
+                self.processed_messages = set(data.get('processed', []))
+                self._by_ts = [(float(ts), ts) for ts in self.processed_messages]
+                heapq.heapify(self._by_ts)
+                self.watermark = float(data.get('watermark', 0.0))
+                self.cursor = data.get('cursor')
+                log(f'Loaded {len(self.processed_messages)} processed message(s), cursor {self.cursor}')
+        except Exception as e:
+            log(f'Could not load processed messages: {e}')
+
+    def save(self):
+        """Persist dedup state (atomic write via temp file)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps({
+                'processed': sorted(self.processed_messages, key=float),
+                'watermark': self.watermark,
+                'cursor': self.cursor,
+            }))
+            tmp_path.replace(self.path)
+            self.last_save = time.time()
+        except Exception as e:
+            log(f'Could not save processed messages: {e}')
+
+    def seen(self, ts):
+        """Advance the cursor past ts (saved lazily)"""
+        with self.lock:
+            if self.cursor is None or float(ts) > float(self.cursor):
+                self.cursor = ts
+                if time.time() - self.last_save >= CURSOR_SAVE_INTERVAL:
+                    self.save()
+
+    def claim(self, ts):
+        """Mark ts as relayed. Returns False if it was already claimed."""
+        with self.lock:
+            if float(ts) <= self.watermark or ts in self.processed_messages:
+                return False
+            self.processed_messages.add(ts)
+            heapq.heappush(self._by_ts, (float(ts), ts))
+            if self.cursor is None or float(ts) > float(self.cursor):
+                self.cursor = ts
+            # Evict the oldest ts values, advancing the watermark
+            while len(self.processed_messages) > self.max_entries:
+                old_value, old_ts = heapq.heappop(self._by_ts)
+                self.processed_messages.discard(old_ts)
+                self.watermark = max(self.watermark, old_value)
+            self.save()
+            return True
+
+def ask_claude(anthropic_key, ts, content):
+    """Call Claude for one relay request. Returns the response, or None on error."""
+    try:
+        response = call_claude_api(anthropic_key, content)
+        log(f'  [{ts}] Claude response: {response[:100]}...')
+        return response
+    except urllib.error.HTTPError as e:
+        error_body = e.read().decode()
+        log(f'  [{ts}] Claude API error: {e.code} - {error_body}')
+    except Exception as e:
+        log(f'  [{ts}] Error calling Claude: {e}')
+    return None
+
+def post_reply(slack_token, ts, response):
+    """Post a relay response in the message's thread"""
+    try:
+        post_slack_reply(slack_token, CHANNEL, ts, response)
+        log(f'  [{ts}] Reply posted successfully')
+    except urllib.error.HTTPError as e:
+        log(f'  [{ts}] Slack post error: {e.code}')
+    except Exception as e:
+        log(f'  [{ts}] Error posting reply: {e}')
+
+class RelayPipeline:
+    """
+    Concurrent relay pipeline.
+
+    The fetch stage submit()s requests into a bounded work queue, a pool of
+    workers calls the Claude API, and a single poster thread writes replies
+    to Slack at most once per SLACK_POST_INTERVAL. Replies within the same
+    Slack thread are posted in the order their requests were submitted.
+    """
+
+    def __init__(self, slack_token, anthropic_key, workers=RELAY_WORKERS, max_queue=RELAY_QUEUE_MAX):
+        self.slack_token = slack_token
+        self.anthropic_key = anthropic_key
+        self.workers = workers
+        self._work = queue.Queue(maxsize=max_queue)
+        self._order = defaultdict(deque)  # thread key -> submitted seqs, oldest first
+        self._results = {}  # seq -> (ts, response)
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def start(self):
+        """Start worker and poster threads"""
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f'relay-worker-{i}', daemon=True).start()
+        threading.Thread(target=self._poster, name='relay-poster', daemon=True).start()
+
+    def submit(self, thread_key, ts, content):
+        """Queue a relay request (blocks when the queue is full)"""
+        with self._cond:
+            seq = self._seq
+            self._seq += 1
+            self._order[thread_key].append(seq)
+        self._work.put((seq, ts, content))
+
+    def _worker(self):
+        while True:
+            seq, ts, content = self._work.get()
+            response = ask_claude(self.anthropic_key, ts, content)
+            with self._cond:
+                self._results[seq] = (ts, response)
+                self._cond.notify_all()
+
+    def _next_ready(self):
+        """Pop a finished result that is next in its thread's order, if any"""
+        for thread_key, seqs in self._order.items():
+            if seqs[0] in self._results:
+                seq = seqs.popleft()
+                if not seqs:
+                    del self._order[thread_key]
+                return self._results.pop(seq)
+        return None
+
+    def _poster(self):
+        last_post = 0.0
+        while True:
+            with self._cond:
+                ready = self._next_ready()
+                while ready is None:
+                    self._cond.wait()
+                    ready = self._next_ready()
+
+            ts, response = ready
+            if response is None:
+                continue
+
+            wait = SLACK_POST_INTERVAL - (time.time() - last_post)
+            if wait > 0:
+                time.sleep(wait)
+            post_reply(self.slack_token, ts, response)
+            last_post = time.time()
+
+def process_message(msg, state, slack_token, anthropic_key):
+    """Relay one channel message to Claude if it qualifies"""
+    ts = msg.get('ts')
+    if not ts:
+        return
+    state.seen(ts)
+
+    # Check if should process (cheap filter, no dedup state needed)
+    if not should_process_message(msg, LEADS_BOT, CLAUDE_USER):
+        return
+    if not state.claim(ts):
+        return
+
+    log(f'Processing message {ts}')
+
+    # Extract content
+    content = extract_message_content(msg.get('text', ''), CLAUDE_USER)
+    if not content:
+        log('  Empty content, skipping')
+        return
+
+    log(f'  Content: {content[:100]}...')
+
+    if pipeline:
+        pipeline.submit(msg.get('thread_ts') or ts, ts, content)
+        return
+
+    # Serial mode: call Claude API and post reply in thread
+    response = ask_claude(anthropic_key, ts, content)
+    if response is not None:
+        post_reply(slack_token, ts, response)
+
+def poll_once(state, slack_token, anthropic_key, oldest=None):
+    """Fetch messages newer than oldest (default: the cursor) and process them"""
+    try:
+        for msg in get_messages_since(slack_token, CHANNEL, oldest or state.cursor):
+            process_message(msg, state, slack_token, anthropic_key)
+    except urllib.error.HTTPError as e:
+        log(f'Slack API error: {e.code}')
+    except Exception as e:
+        log(f'Error: {e}')
+
+def run_polling(state, slack_token, anthropic_key, interval=POLL_INTERVAL):
+    """Polling loop"""
+    while True:
+        poll_once(state, slack_token, anthropic_key)
+        time.sleep(interval)
+
+def run_reconcile(state, slack_token, anthropic_key, interval=RECONCILE_INTERVAL):
+    """
+    Socket Mode safety net: catch up from the cursor once, then re-scan a
+    lookback window every interval. A dropped event is older than the events
+    delivered after it, so polling from the cursor would never fetch it;
+    RelayState skips everything that was already handled.
+    """
+    poll_once(state, slack_token, anthropic_key)
+    while True:
+        time.sleep(interval)
+        oldest = f'{time.time() - interval - RECONCILE_OVERLAP:.6f}'
+        poll_once(state, slack_token, anthropic_key, oldest=oldest)
+
+def run_socket_mode(state, slack_token, slack_app_token, anthropic_key):
+    """Handle channel messages as Slack delivers them over Socket Mode"""
+    app = App(token=slack_token)
+
+    @app.event("message")
+    def handle_message(event):
+        if event.get('channel') != CHANNEL:
+            return
+        process_message(event, state, slack_token, anthropic_key)
+
+    # Catch up on anything posted while we were down, then reconcile
+    # periodically in case an event is ever dropped
+    reconcile = threading.Thread(
+        target=run_reconcile,
+        args=(state, slack_token, anthropic_key, RECONCILE_INTERVAL),
+        daemon=True
+    )
+    reconcile.start()
+
+    SocketModeHandler(app, slack_app_token).start()
+
 def main():
+    global llm_cache, pipeline
     load_env()
 
     slack_token = os.environ.get('SLACK_BOT_TOKEN')
+    # Socket Mode needs the relay's own app token - never sleepless-daemon's
+    slack_app_token = os.environ.get('RELAY_SLACK_APP_TOKEN')
+    if slack_app_token and slack_app_token == os.environ.get('SLACK_APP_TOKEN'):
+        log('RELAY_SLACK_APP_TOKEN is the same app token sleepless-daemon uses '
+            '(Slack would split events between them), using polling')
+        slack_app_token = None
     anthropic_key = os.environ.get('ANTHROPIC_API_KEY')
 
     if not slack_token:
@@ -161,67 +495,37 @@ def main():
         log('Get your API key from: https://console.anthropic.com/settings/keys')
         sys.exit(1)
 
+    try:
+        llm_cache = LLMCache(LLM_CACHE_FILE, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        log(f'LLM cache unavailable: {e}')
+
+    use_socket_mode = '--poll' not in sys.argv and slack_app_token and App is not None
+    if '--poll' not in sys.argv and slack_app_token and not use_socket_mode:
+        log('Socket Mode unavailable (needs slack-bolt), using polling')
+
     log('Claude Relay Daemon started')
+    log(f'  Mode: {"Socket Mode" if use_socket_mode else "polling"}')
     log(f'  Channel: {CHANNEL}')
     log(f'  Monitoring messages from: {LEADS_BOT}')
     log(f'  Trigger: mentions of {CLAUDE_USER}')
-    log(f'  Poll interval: {POLL_INTERVAL}s')
+    log(f'  Processing: {"serial" if "--serial" in sys.argv else f"pipelined ({RELAY_WORKERS} workers)"}')
+    if use_socket_mode:
+        log(f'  Reconcile interval: {RECONCILE_INTERVAL}s (re-scans last {RECONCILE_INTERVAL + RECONCILE_OVERLAP}s)')
+    else:
+        log(f'  Poll interval: {POLL_INTERVAL}s')
     log('')
 
-    processed_messages = set()
-
-    while True:
-        try:
-            messages = get_recent_messages(slack_token, CHANNEL)
-
-            for msg in messages:
-                ts = msg.get('ts')
-
-                # Skip already processed
-                if ts in processed_messages:
-                    continue
+    state = RelayState()
 
-                # Check if should process
-                if not should_process_message(msg, LEADS_BOT, CLAUDE_USER):
-                    processed_messages.add(ts)  # Mark as seen
-                    continue
-
-                log(f'Processing message {ts}')
-                processed_messages.add(ts)
-
-                # Extract content
-                content = extract_message_content(msg.get('text', ''), CLAUDE_USER)
-                if not content:
-                    log('  Empty content, skipping')
-                    continue
-
-                log(f'  Content: {content[:100]}...')
-
-                # Call Claude API
-                try:
-                    response = call_claude_api(anthropic_key, content)
-                    log(f'  Claude response: {response[:100]}...')
-
-                    # Post reply in thread
-                    post_slack_reply(slack_token, CHANNEL, ts, response)
-                    log('  Reply posted successfully')
-
-                except urllib.error.HTTPError as e:
-                    error_body = e.read().decode()
-                    log(f'  Claude API error: {e.code} - {error_body}')
-                except Exception as e:
-                    log(f'  Error calling Claude: {e}')
-
-            # Cleanup old processed messages
-            if len(processed_messages) > MAX_PROCESSED:
-                processed_messages.clear()
-
-        except urllib.error.HTTPError as e:
-            log(f'Slack API error: {e.code}')
-        except Exception as e:
-            log(f'Error: {e}')
+    if '--serial' not in sys.argv:
+        pipeline = RelayPipeline(slack_token, anthropic_key)
+        pipeline.start()
 
-        time.sleep(POLL_INTERVAL)
+    if use_socket_mode:
+        run_socket_mode(state, slack_token, slack_app_token, anthropic_key)
+    else:
+        run_polling(state, slack_token, anthropic_key)
 
 if __name__ == '__main__':
     if '--daemon' in sys.argv:
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Conversation Store for the Sleepless Daemon
+
+Pluggable storage for Slack thread conversations (message history, review
+counters and backoff). Two backends share one interface:
+
+    MemoryConversationStore  - process-local dict (state lost on restart)
+    SQLiteConversationStore  - SQLite in WAL mode, indexed on thread_ts,
+                               last_user_activity and channel; threads are
+                               loaded lazily into a write-through LRU cache
+
+Usage:
+    from conversation_store import create_conversation_store
+
+    store = create_conversation_store('sqlite', db_path, max_history=10, initial_review_delay=3600)
+    store.add_message(thread_ts, 'user', text, channel=channel, is_user=True)
+    conv = store.get(thread_ts)
+"""
+
+from __future__ import annotations
+
+import abc
+import copy
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+def new_conversation(thread_ts: str, initial_review_delay: float) -> Dict[str, Any]:
+    """Create an empty conversation record."""
+    return {
+        'thread_ts': thread_ts,
+        'messages': [],
+        'last_activity': 0,
+        'channel': None,
+        'last_user_activity': 0,
+        'review_count': 0,
+        'next_review_delay': initial_review_delay,
+    }
+
+
+class ConversationStore(abc.ABC):
+    """
+    Base conversation store.
+
+    Subclasses implement _load/_save/_delete_inactive/_review_candidates; the base
+    class owns the lock and the message/backoff bookkeeping so both backends
+    behave identically.
+    """
+
+    def __init__(self, max_history: int, initial_review_delay: float):
+        self.max_history = max_history
+        self.initial_review_delay = initial_review_delay
+        self._lock = threading.RLock()
+
+    # Backend hooks ---------------------------------------------------------
+
+    @abc.abstractmethod
+    def _load(self, thread_ts: str) -> Optional[Dict[str, Any]]:
+        """Get the live record for a thread, or None if unknown."""
+
+    @abc.abstractmethod
+    def _save(self, conv: Dict[str, Any]) -> None:
+        """Persist a conversation record."""
+
+    @abc.abstractmethod
+    def _delete_inactive(self, before: float) -> int:
+        """Delete threads inactive since before; return how many were deleted."""
+
+    @abc.abstractmethod
+    def _review_candidates(self, max_reviews: int) -> List[Dict[str, Any]]:
+        """Get live records of threads reviewed fewer than max_reviews times."""
+
+    @abc.abstractmethod
+    def count_active(self) -> int:
+        """Count threads with at least one message."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+    # Public API ------------------------------------------------------------
+
+    def get(self, thread_ts: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of a conversation, or None if unknown."""
+        with self._lock:
+            conv = self._load(thread_ts)
+            return copy.deepcopy(conv) if conv else None
+
+    def has_messages(self, thread_ts: str) -> bool:
+        """Check if a thread has any stored messages."""
+        with self._lock:
+            conv = self._load(thread_ts)
+            return bool(conv and conv['messages'])
+
+    def add_message(self, thread_ts: str, role: str, content: str,
+                    channel: Optional[str] = None, is_user: bool = False) -> Dict[str, Any]:
+        """
+        Append a message to a thread, creating it if needed.
+
+        Returns:
+            Copy of the updated conversation
+        """
+        now = time.time()
+        with self._lock:
+            conv = self._load(thread_ts) or new_conversation(thread_ts, self.initial_review_delay)
+            conv['messages'].append({'role': role, 'content': content, 'time': now})
+            conv['last_activity'] = now
+            if is_user:
+                conv['last_user_activity'] = now
+                # Reset review delay on user activity
+                conv['next_review_delay'] = self.initial_review_delay
+            if channel:
+                conv['channel'] = channel
+            # Trim to max history
+            if len(conv['messages']) > self.max_history:
+                conv['messages'] = conv['messages'][-self.max_history:]
+            self._save(conv)
+            return copy.deepcopy(conv)
+
+    def mark_reviewed(self, thread_ts: str, backoff_multiplier: float, max_delay: float) -> Optional[Dict[str, Any]]:
+        """
+        Increment a thread's review count and back off its next review.
+
+        Returns:
+            Copy of the updated conversation, or None if unknown
+        """
+        with self._lock:
+            conv = self._load(thread_ts)
+            if not conv:
+                return None
+            conv['review_count'] = conv.get('review_count', 0) + 1
+            current_delay = conv.get('next_review_delay', self.initial_review_delay)
+            conv['next_review_delay'] = min(current_delay * backoff_multiplier, max_delay)
+            self._save(conv)
+            return copy.deepcopy(conv)
+
+    def delete_inactive(self, before: float) -> int:
+        """
+        Delete threads whose last activity is older than before.
+
+        Returns:
+            Number of threads deleted
+        """
+        with self._lock:
+            return self._delete_inactive(before)
+
+    def review_candidates(self, max_reviews: int) -> List[Dict[str, Any]]:
+        """
+        Get every thread that may still need a review (used to seed the review scheduler).
+
+        Args:
+            max_reviews: Skip threads already reviewed this many times
+
+        Returns:
+            Copies of the matching conversations
+        """
+        with self._lock:
+            return [copy.deepcopy(conv) for conv in self._review_candidates(max_reviews)]
+
+
+class MemoryConversationStore(ConversationStore):
+    """In-process conversation store (state is lost on restart)."""
+
+    def __init__(self, max_history: int, initial_review_delay: float):
+        super().__init__(max_history, initial_review_delay)
+        self._threads: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self, thread_ts: str) -> Optional[Dict[str, Any]]:
+        return self._threads.get(thread_ts)
+
+    def _save(self, conv: Dict[str, Any]) -> None:
+        self._threads[conv['thread_ts']] = conv
+
+    def _delete_inactive(self, before: float) -> int:
+        expired = [ts for ts, conv in self._threads.items() if conv['last_activity'] < before]
+        for ts in expired:
+            del self._threads[ts]
+        return len(expired)
+
+    def _review_candidates(self, max_reviews: int) -> List[Dict[str, Any]]:
+        return [conv for conv in self._threads.values() if conv.get('review_count', 0) < max_reviews]
+
+    def count_active(self) -> int:
+        with self._lock:
+            return sum(1 for conv in self._threads.values() if conv['messages'])
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    SQLite-backed conversation store (WAL mode).
+
+    Threads are read from the database the first time they are touched and
+    kept in a write-through LRU cache of CACHE_SIZE threads, so reads of
+    active threads never hit disk and a restarted daemon picks up where it
+    left off. Every save is written back immediately, so evicting a thread
+    never loses state.
+    """
+
+    CACHE_SIZE = 1024
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS threads (
+            thread_ts TEXT PRIMARY KEY,
+            channel TEXT,
+            messages TEXT NOT NULL,
+            last_activity REAL NOT NULL,
+            last_user_activity REAL NOT NULL,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            next_review_delay REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_threads_last_user_activity ON threads (last_user_activity);
+        CREATE INDEX IF NOT EXISTS idx_threads_last_activity ON threads (last_activity);
+        CREATE INDEX IF NOT EXISTS idx_threads_channel ON threads (channel);
+    """
+
+    COLUMNS = ('thread_ts', 'channel', 'messages', 'last_activity',
+               'last_user_activity', 'review_count', 'next_review_delay')
+
+    def __init__(self, db_path: Path, max_history: int, initial_review_delay: float):
+        super().__init__(max_history, initial_review_delay)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+
+    def _row_to_conv(self, row: sqlite3.Row) -> Dict[str, Any]:
+        conv = dict(zip(self.COLUMNS, row))
+        conv['messages'] = json.loads(conv['messages'])
+        return conv
+
+    def _select(self, where: str, params: tuple) -> List[Dict[str, Any]]:
+        sql = f'SELECT {", ".join(self.COLUMNS)} FROM threads WHERE {where}'
+        return [self._row_to_conv(row) for row in self._conn.execute(sql, params)]
+
+    def _cache_put(self, conv: Dict[str, Any]) -> None:
+        self._cache[conv['thread_ts']] = conv
+        self._cache.move_to_end(conv['thread_ts'])
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _load(self, thread_ts: str) -> Optional[Dict[str, Any]]:
+        conv = self._cache.get(thread_ts)
+        if conv is not None:
+            self._cache.move_to_end(thread_ts)
+            return conv
+        rows = self._select('thread_ts = ?', (thread_ts,))
+        if not rows:
+            return None
+        self._cache_put(rows[0])
+        return rows[0]
+
+    def _save(self, conv: Dict[str, Any]) -> None:
+        self._conn.execute(
+            f'INSERT OR REPLACE INTO threads ({", ".join(self.COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                conv['thread_ts'],
+                conv['channel'],
+                json.dumps(conv['messages']),
+                conv['last_activity'],
+                conv['last_user_activity'],
+                conv.get('review_count', 0),
+                conv.get('next_review_delay', self.initial_review_delay),
+            ),
+        )
+        self._cache_put(conv)
+
+    def _delete_inactive(self, before: float) -> int:
+        cursor = self._conn.execute('DELETE FROM threads WHERE last_activity < ?', (before,))
+        for ts in [ts for ts, conv in self._cache.items() if conv['last_activity'] < before]:
+            del self._cache[ts]
+        return cursor.rowcount
+
+    def _review_candidates(self, max_reviews: int) -> List[Dict[str, Any]]:
+        rows = self._select('review_count < ? AND channel IS NOT NULL', (max_reviews,))
+        # Prefer cached copies so in-flight updates are never shadowed
+        return [self._cache.get(conv['thread_ts'], conv) for conv in rows]
+
+    def count_active(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM threads WHERE messages != '[]'").fetchone()
+            return row[0] if row else 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_conversation_store(backend: str, db_path: Optional[Path], max_history: int,
+                              initial_review_delay: float) -> ConversationStore:
+    """
+    Create a conversation store.
+
+    Args:
+        backend: 'sqlite' or 'memory'
+        db_path: Database file for the sqlite backend
+        max_history: Max messages kept per thread
+        initial_review_delay: Review delay for new / freshly active threads
+
+    Returns:
+        ConversationStore instance
+    """
+    if backend == 'sqlite':
+        return SQLiteConversationStore(db_path, max_history, initial_review_delay)
+    if backend == 'memory':
+        return MemoryConversationStore(max_history, initial_review_delay)
+    raise ValueError(f'Unknown conversation store backend: {backend}')
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Transport for Sleepless / Slack Scripts
+
+Small stdlib-only HTTP client with keep-alive connection pooling per host,
+consistent timeouts, gzip response decoding and optional retry-with-jitter.
+Used by the sleepless daemon, the relay daemon and the Slack helper scripts
+so repeated calls to the same host reuse one TCP/TLS connection.
+
+Errors are raised as urllib.error.HTTPError (status >= 400) and
+urllib.error.URLError (connection failures), so callers written against
+urllib.request keep their existing error handling.
+
+Non-idempotent requests (POST, PATCH) are only resent after a connection
+error when the failure happened before the request was written; a failure
+while waiting for the response may mean the server already acted on it
+(e.g. a billed LLM completion), so it is raised unless the caller passes
+idempotent=True.
+
+Usage:
+    from http_transport import request, post_json
+
+    resp = post_json('https://slack.com/api/chat.postMessage', payload,
+                     headers={'Authorization': f'Bearer {token}'})
+    result = resp.json()
+"""
+
+from __future__ import annotations
+
+import gzip
+import http.client
+import io
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TIMEOUT = 30  # seconds
+MAX_IDLE_PER_HOST = 4  # idle keep-alive connections kept per host
+RETRY_BACKOFF = 0.5  # base seconds for retry backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+NON_IDEMPOTENT_MAX_IDLE = 10  # seconds; older idle connections are not reused for POSTs
+USER_AGENT = 'yellowcircle-sleepless/1.0'
+
+PoolKey = Tuple[str, str, int]
+
+
+class Response:
+    """Fully-read HTTP response."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def read(self) -> bytes:
+        """Return the decoded response body (urllib-compatible)."""
+        return self.body
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        """Return the response body as text."""
+        return self.body.decode(encoding, errors='replace')
+
+    def json(self) -> Any:
+        """Parse the response body as JSON."""
+        return json.loads(self.body.decode('utf-8'))
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP(S) connections keyed by host.
+
+    Connections are checked out for the duration of one request and returned
+    afterwards unless the server asked to close them.
+    """
+
+    def __init__(self, max_idle_per_host: int = MAX_IDLE_PER_HOST):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[PoolKey, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(
+        self,
+        key: PoolKey,
+        timeout: float,
+        fresh: bool = False,
+        max_idle: Optional[float] = None,
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Get an idle connection for key, or open a new one. Returns (conn, reused).
+
+        With max_idle, connections idle for longer than max_idle seconds are
+        closed instead of reused (they are the ones a server is likely to
+        have dropped).
+        """
+        stale = []
+        reused_conn = None
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle and not fresh:
+                conn, released_at = idle.pop()
+                if max_idle is not None and time.monotonic() - released_at > max_idle:
+                    stale.append(conn)
+                    continue
+                reused_conn = conn
+                break
+        for conn in stale:
+            conn.close()
+        if reused_conn is not None:
+            reused_conn.timeout = timeout
+            if reused_conn.sock is not None:
+                reused_conn.sock.settimeout(timeout)
+            return reused_conn, True
+
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def release(self, key: PoolKey, conn: http.client.HTTPConnection) -> None:
+        """Return a connection to the pool, closing it if the pool is full."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close_all(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c, _ in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+_pool = ConnectionPool()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool."""
+    return _pool
+
+
+def _pool_key(parsed: urllib.parse.SplitResult) -> PoolKey:
+    scheme = parsed.scheme.lower()
+    if scheme not in ('http', 'https'):
+        raise urllib.error.URLError(f'unsupported URL scheme: {scheme}')
+    port = parsed.port or (443 if scheme == 'https' else 80)
+    return scheme, parsed.hostname or '', port
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    encoding = (encoding or '').lower()
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        return zlib.decompress(body)
+    return body
+
+
+def _backoff(attempt: int, base: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, base * (2 ** attempt))
+
+
+class _NotSentError(urllib.error.URLError):
+    """Connection failed before the request was fully written (safe to resend)."""
+
+
+def _send_once(
+    method: str,
+    url: str,
+    data: Any,
+    headers: Dict[str, str],
+    timeout: float,
+    idempotent: bool,
+) -> Response:
+    parsed = urllib.parse.urlsplit(url)
+    key = _pool_key(parsed)
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+    rewindable = data is None or isinstance(data, (bytes, bytearray, str))
+    max_idle = None if idempotent else NON_IDEMPOTENT_MAX_IDLE
+
+    # A pooled connection may have been closed by the server while idle;
+    # retry once on a fresh connection if a reused one fails. Failures while
+    # sending are always safe to retry; failures while waiting for the
+    # response only for idempotent requests.
+    for fresh in (False, True):
+        conn, reused = _pool.acquire(key, timeout, fresh=fresh, max_idle=max_idle)
+        try:
+            conn.request(method, path, body=data, headers=headers)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if reused and not fresh and rewindable:
+                continue
+            raise _NotSentError(e)
+
+        try:
+            raw = conn.getresponse()
+            body = raw.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+            conn.close()
+            if reused and not fresh and rewindable and idempotent:
+                continue
+            raise urllib.error.URLError(e)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise urllib.error.URLError(e)
+
+        resp_headers = {k.lower(): v for k, v in raw.getheaders()}
+        if raw.will_close:
+            conn.close()
+        else:
+            _pool.release(key, conn)
+
+        body = _decode_body(body, resp_headers.get('content-encoding', ''))
+        return Response(url, raw.status, raw.reason, resp_headers, body)
+
+    raise urllib.error.URLError('connection failed')
+
+
+def request(
+    method: str,
+    url: str,
+    data: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = 0,
+    backoff: float = RETRY_BACKOFF,
+    idempotent: Optional[bool] = None,
+) -> Response:
+    """
+    Send an HTTP request over a pooled keep-alive connection.
+
+    Args:
+        method: HTTP method
+        url: Absolute http(s) URL
+        data: Request body (bytes, str, or a readable file object)
+        headers: Extra request headers
+        timeout: Socket timeout in seconds
+        retries: Extra attempts on connection errors and 429/5xx responses
+        backoff: Base seconds for exponential backoff with jitter
+        idempotent: Whether the request may be resent after the server could
+            have received it. Defaults to True for GET/HEAD/OPTIONS/PUT/DELETE;
+            other methods are only retried on errors before the request was sent
+
+    Returns:
+        Response with the decoded body
+
+    Raises:
+        urllib.error.HTTPError: Final response status >= 400
+        urllib.error.URLError: Connection failed
+    """
+    req_headers = {'Accept-Encoding': 'gzip', 'User-Agent': USER_AGENT}
+    req_headers.update(headers or {})
+
+    # File-like bodies can only be sent once
+    if data is not None and not isinstance(data, (bytes, bytearray, str)):
+        retries = 0
+
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+    attempt = 0
+    while True:
+        try:
+            resp = _send_once(method, url, data, req_headers, timeout, idempotent)
+        except urllib.error.URLError as e:
+            if attempt >= retries or not (idempotent or isinstance(e, _NotSentError)):
+                raise
+            time.sleep(_backoff(attempt, backoff))
+            attempt += 1
+            continue
+
+        if resp.status in RETRY_STATUSES and attempt < retries:
+            retry_after = resp.headers.get('retry-after', '')
+            delay = float(retry_after) if retry_after.isdigit() else _backoff(attempt, backoff)
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        if resp.status >= 400:
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, io.BytesIO(resp.body))
+        return resp
+
+
+def get(url: str, **kwargs: Any) -> Response:
+    """Send a GET request."""
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, data: Any = None, **kwargs: Any) -> Response:
+    """Send a POST request."""
+    return request('POST', url, data=data, **kwargs)
+
+
+def post_json(url: str, payload: Any, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> Response:
+    """POST a JSON payload."""
+    req_headers = {'Content-Type': 'application/json; charset=utf-8'}
+    req_headers.update(headers or {})
+    return request('POST', url, data=json.dumps(payload).encode('utf-8'), headers=req_headers, **kwargs)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+
+Content-addressed cache for LLM responses, persisted in SQLite (WAL mode)
+with TTL expiry and LRU eviction. Keys are the SHA-256 of the model name,
+optional system prompt and a whitespace-normalized prompt, so identical or
+trivially reformatted requests (a bot re-posting the same message, a thread
+re-reviewed with no new messages) skip the provider round-trip.
+
+Usage:
+    from llm_cache import LLMCache
+
+    cache = LLMCache(db_path, ttl_seconds=86400, max_entries=500)
+    hit = cache.get('gemini-1.5-flash', prompt)
+    if hit is None:
+        response = call_provider(prompt)
+        cache.put('gemini-1.5-flash', prompt, response, source='gemini')
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_TTL = 86400  # 24 hours
+DEFAULT_MAX_ENTRIES = 500
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt for cache keying (unicode form, whitespace runs, edges)."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', prompt)).strip()
+
+
+def cache_key(model: str, prompt: str, system: str = '') -> str:
+    """Build the content-addressed key for a request."""
+    digest = hashlib.sha256()
+    for part in (model, normalize_prompt(system), normalize_prompt(prompt)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent TTL + LRU cache of LLM responses.
+
+    Thread-safe; several processes may share one database file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            source TEXT,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+        CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at);
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(self.SCHEMA)
+
+    def get(self, model: str, prompt: str, system: str = '') -> Optional[Tuple[str, str]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            (response, source) on a hit, None on a miss or expired entry
+        """
+        key = cache_key(model, prompt, system)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response, source, created_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row and now - row[2] <= self.ttl_seconds:
+                self._conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+                self.hits += 1
+                return row[0], row[1] or ''
+            if row:
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self.misses += 1
+            return None
+
+    def put(self, model: str, prompt: str, response: str, source: str = '', system: str = '') -> None:
+        """Store a response, evicting expired and least-recently-used entries."""
+        if not response:
+            return
+        key = cache_key(model, prompt, system)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, model, source, response, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, model, source, response, now, now),
+            )
+            self._conn.execute('DELETE FROM responses WHERE created_at < ?', (now - self.ttl_seconds,))
+            count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)',
+                    (count - self.max_entries,),
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and entry count."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': entries,
+                'max_entries': self.max_entries,
+            }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
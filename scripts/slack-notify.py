@@ -1,18 +1,45 @@
 #!/usr/bin/env python3
 """
 Slack Notification Script for Claude Code Autonomous Tasks
-Usage: python3 scripts/slack-notify.py "message" [channel]
+Usage: python3 scripts/slack-notify.py "message" [channel] [--now]
+       python3 scripts/slack-notify.py --daemon
 
 Examples:
     python3 scripts/slack-notify.py "Task completed successfully"
     python3 scripts/slack-notify.py "Error in deployment" "#alerts"
+
+When a notify daemon is running, messages are written to a spool directory
+instead of posted directly; the daemon coalesces messages that arrive within
+COALESCE_WINDOW seconds into one post per channel, spaces posts to respect
+Slack's chat.postMessage rate limit and flushes everything on shutdown.
+--now bypasses the spool.
 """
 
 import sys
 import os
 import json
-import urllib.request
+import time
+import uuid
+import signal
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_transport import post_json
+
+STATE_DIR = Path.home() / 'Library' / 'Application Support' / 'yellowcircle' / 'slack'
+SPOOL_DIR = STATE_DIR / 'notify-spool'
+DAEMON_PID_FILE = STATE_DIR / 'notify-daemon.pid'
+COALESCE_WINDOW = 3.0  # seconds of quiet before a channel's batch is posted
+COALESCE_MAX_WAIT = 15.0  # post anyway once the oldest message is this old
+SPOOL_POLL_INTERVAL = 0.5  # seconds between spool scans
+MAX_COALESCED_CHARS = 3500  # split a channel's batch into several posts past this
+# Minimum seconds between posts per Slack method and channel
+# (chat.postMessage is limited to roughly one message per second per channel)
+METHOD_MIN_INTERVAL = {
+    'chat.postMessage': 1.0,
+}
 
 def load_env():
     """Load environment variables from .env file"""
@@ -24,8 +51,45 @@ def load_env():
                     key, _, value = line.strip().partition('=')
                     os.environ.setdefault(key, value)
 
-def send_slack_message(message, channel=None):
-    """Send a message to Slack"""
+def post_message(token, channel, text):
+    """
+    Post a message with chat.postMessage.
+
+    Returns (ok, error); error is None on success. Network failures raise.
+    """
+    result = post_json(
+        'https://slack.com/api/chat.postMessage',
+        {
+            'channel': channel,
+            'text': text,
+            'unfurl_links': False
+        },
+        headers={'Authorization': f'Bearer {token}'},
+        retries=2
+    ).json()
+    return bool(result.get('ok')), result.get('error')
+
+def daemon_running():
+    """Check whether a notify daemon is alive"""
+    try:
+        pid = int(DAEMON_PID_FILE.read_text().strip())
+        os.kill(pid, 0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+def spool_message(message, channel):
+    """Queue a message for the notify daemon (atomic write-then-rename)"""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    now = time.time()
+    name = f"{now:.6f}-{uuid.uuid4().hex[:8]}"
+    tmp_path = SPOOL_DIR / f"{name}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'channel': channel, 'text': message, 'time': now}, f)
+    os.replace(tmp_path, SPOOL_DIR / f"{name}.json")
+
+def send_slack_message(message, channel=None, direct=False):
+    """Send a message to Slack (via the notify daemon's spool when it is running)"""
     load_env()
 
     token = os.environ.get('SLACK_BOT_TOKEN')
@@ -36,44 +100,173 @@ def send_slack_message(message, channel=None):
     # Default to bot's DM channel or specified channel
     target_channel = channel or os.environ.get('SLACK_CHANNEL', 'U0A2J4EK753')
 
+    if not direct and daemon_running():
+        try:
+            spool_message(message, target_channel)
+            print(f"✓ Message queued for {target_channel}")
+            return True
+        except OSError as e:
+            print(f"Warning: Could not spool message, sending directly: {e}")
+
     timestamp = datetime.now().strftime('%H:%M')
     formatted_message = f"🤖 *Claude Agent* [{timestamp}]\n{message}"
 
-    data = json.dumps({
-        'channel': target_channel,
-        'text': formatted_message,
-        'unfurl_links': False
-    }).encode('utf-8')
-
-    req = urllib.request.Request(
-        'https://slack.com/api/chat.postMessage',
-        data=data,
-        headers={
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json; charset=utf-8'
-        }
-    )
-
     try:
-        response = urllib.request.urlopen(req)
-        result = json.loads(response.read().decode())
-        if result.get('ok'):
+        ok, error = post_message(token, target_channel, formatted_message)
+        if ok:
             print(f"✓ Message sent to {target_channel}")
             return True
         else:
-            print(f"✗ Slack error: {result.get('error')}")
+            print(f"✗ Slack error: {error}")
             return False
     except Exception as e:
         print(f"✗ Request failed: {e}")
         return False
 
+def coalesce_messages(entries):
+    """
+    Join spooled messages for one channel into as few posts as possible.
+
+    Returns a list of (text, entries) pairs, each text under MAX_COALESCED_CHARS
+    unless a single message is longer on its own.
+    """
+    posts = []
+    lines, batch, size = [], [], 0
+    for entry in entries:
+        stamp = datetime.fromtimestamp(entry['time']).strftime('%H:%M')
+        line = f"[{stamp}] {entry['text']}" if len(entries) > 1 else entry['text']
+        if batch and size + len(line) > MAX_COALESCED_CHARS:
+            posts.append((lines, batch))
+            lines, batch, size = [], [], 0
+        lines.append(line)
+        batch.append(entry)
+        size += len(line) + 1
+
+    if batch:
+        posts.append((lines, batch))
+
+    results = []
+    for lines, batch in posts:
+        stamp = datetime.fromtimestamp(batch[0]['time']).strftime('%H:%M')
+        results.append((f"🤖 *Claude Agent* [{stamp}]\n" + '\n'.join(lines), batch))
+    return results
+
+class NotifyDaemon:
+    """Spool consumer that coalesces and rate-limits notifications per channel"""
+
+    def __init__(self, token):
+        self.token = token
+        self.pending = {}  # channel -> [entry, ...] in arrival order
+        self.last_post = {}  # (method, channel) -> time of last post
+        self.running = True
+
+    def scan(self):
+        """Load newly spooled messages into the pending batches"""
+        seen = {entry['path'] for entries in self.pending.values() for entry in entries}
+        for path in sorted(SPOOL_DIR.glob('*.json')):
+            if path in seen:
+                continue
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"✗ Dropping unreadable spool file {path.name}: {e}")
+                path.unlink(missing_ok=True)
+                continue
+            data['path'] = path
+            self.pending.setdefault(data['channel'], []).append(data)
+
+    def wait_for_slot(self, method, channel):
+        """Sleep until method may be called again for channel"""
+        interval = METHOD_MIN_INTERVAL.get(method, 0)
+        wait = self.last_post.get((method, channel), 0) + interval - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_post[(method, channel)] = time.time()
+
+    def flush(self, force=False):
+        """Post every channel batch whose coalesce window has closed (all of them if force)"""
+        now = time.time()
+        for channel in list(self.pending):
+            entries = self.pending[channel]
+            # Wait for the channel to go quiet, but never hold a message too long
+            quiet = now - entries[-1]['time'] >= COALESCE_WINDOW
+            overdue = now - entries[0]['time'] >= COALESCE_MAX_WAIT
+            if not (force or quiet or overdue):
+                continue
+
+            for text, batch in coalesce_messages(entries):
+                self.wait_for_slot('chat.postMessage', channel)
+                try:
+                    ok, error = post_message(self.token, channel, text)
+                except Exception as e:
+                    # Leave the rest queued; the next flush retries
+                    print(f"✗ Request failed ({channel}): {e}")
+                    break
+                if ok:
+                    print(f"✓ Sent {len(batch)} message(s) to {channel}")
+                else:
+                    print(f"✗ Slack error ({channel}): {error}; dropping {len(batch)} message(s)")
+                for entry in batch:
+                    entry['path'].unlink(missing_ok=True)
+                    entries.remove(entry)
+
+            if not entries:
+                del self.pending[channel]
+
+    def stop(self, signum=None, frame=None):
+        """Signal handler: finish the current scan, flush and exit"""
+        self.running = False
+
+    def run(self):
+        """Consume the spool until SIGTERM/SIGINT, then flush what is left"""
+        SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+        DAEMON_PID_FILE.write_text(str(os.getpid()))
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print(f"Notify daemon watching {SPOOL_DIR} (window {COALESCE_WINDOW}s)")
+
+        try:
+            while self.running:
+                self.scan()
+                self.flush()
+                time.sleep(SPOOL_POLL_INTERVAL)
+        finally:
+            self.scan()
+            self.flush(force=True)
+            DAEMON_PID_FILE.unlink(missing_ok=True)
+            print("Notify daemon stopped")
+
+def run_daemon():
+    """Run the notify daemon in the foreground"""
+    load_env()
+
+    token = os.environ.get('SLACK_BOT_TOKEN')
+    if not token:
+        print("Error: SLACK_BOT_TOKEN not set")
+        return False
+
+    if daemon_running():
+        print("Error: Notify daemon already running")
+        return False
+
+    NotifyDaemon(token).run()
+    return True
+
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
-        print("Usage: python3 scripts/slack-notify.py \"message\" [channel]")
+    if '--daemon' in sys.argv[1:]:
+        sys.exit(0 if run_daemon() else 1)
+
+    direct = '--now' in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg != '--now']
+
+    if not args:
+        print("Usage: python3 scripts/slack-notify.py \"message\" [channel] [--now]")
+        print("       python3 scripts/slack-notify.py --daemon")
         sys.exit(1)
 
-    message = sys.argv[1]
-    channel = sys.argv[2] if len(sys.argv) > 2 else None
+    message = args[0]
+    channel = args[1] if len(args) > 1 else None
 
-    success = send_slack_message(message, channel)
+    success = send_slack_message(message, channel, direct=direct)
     sys.exit(0 if success else 1)
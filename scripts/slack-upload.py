@@ -3,16 +3,133 @@
 Slack File Upload Script for Claude Code Autonomous Tasks
 Uses new Slack files.getUploadURLExternal / files.completeUploadExternal API
 
-Usage: python3 scripts/slack-upload.py "message" file1.png [file2.png ...] [channel]
+Usage: python3 scripts/slack-upload.py "message" file1.png [file2.png ...] [channel] [--sequential] [--no-dedup]
+
+Files are uploaded concurrently and shared in one message; --sequential
+uploads them one at a time (one message per file). Files already uploaded
+to the same channel (same SHA-256) are linked instead of re-sent; --no-dedup
+forces an upload. Dedup checks the old copy with files.info, which needs the
+bot's files:read scope (without it every file is uploaded).
 """
 
 import sys
 import os
 import json
-import urllib.request
+import time
+import hashlib
+import threading
 import urllib.parse
 from datetime import datetime
+from pathlib import Path
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from http_transport import get, post, post_json
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # bytes read from disk per chunk
+PROGRESS_STEP = 25  # percent between progress lines
+UPLOAD_WORKERS = 8  # concurrent uploads in batch mode
+UPLOAD_INDEX_FILE = Path.home() / 'Library' / 'Application Support' / 'yellowcircle' / 'slack' / 'upload-index.json'
+UPLOAD_INDEX_MAX_ENTRIES = 500  # least recently used entries are evicted past this
+
+class UploadIndex:
+    """
+    Local (channel, SHA-256) -> Slack file index for upload dedup.
+
+    Keyed per channel: a permalink is only reused in the channel the file was
+    shared to, since members of other channels may not be able to open it.
+    Entries are evicted least-recently-used once the index holds more than
+    max_entries; the file is rewritten atomically on save().
+    """
+
+    def __init__(self, path=UPLOAD_INDEX_FILE, max_entries=UPLOAD_INDEX_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.entries = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                # Entries from before per-channel keys carry no channel; drop them
+                self.entries = {k: v for k, v in json.load(f).get('files', {}).items() if ':' in k}
+        except (OSError, ValueError, AttributeError):
+            self.entries = {}
+
+    @staticmethod
+    def key(channel, sha256):
+        return f"{channel}:{sha256}"
+
+    def lookup(self, channel, sha256):
+        """Get the entry for a hash in channel (marking it recently used), or None"""
+        with self._lock:
+            entry = self.entries.get(self.key(channel, sha256))
+            if entry:
+                entry['last_used'] = time.time()
+            return entry
+
+    def record(self, channel, sha256, file_id, name, size):
+        """Remember a file shared to channel, evicting the oldest entries past max_entries"""
+        with self._lock:
+            now = time.time()
+            self.entries[self.key(channel, sha256)] = {
+                'file_id': file_id, 'name': name, 'size': size,
+                'uploaded_at': now, 'last_used': now
+            }
+            if len(self.entries) > self.max_entries:
+                by_age = sorted(self.entries, key=lambda k: self.entries[k].get('last_used', 0))
+                for key in by_age[:len(self.entries) - self.max_entries]:
+                    del self.entries[key]
+
+    def forget(self, channel, sha256):
+        """Drop an entry whose Slack file no longer exists"""
+        with self._lock:
+            self.entries.pop(self.key(channel, sha256), None)
+
+    def save(self):
+        """Persist the index atomically"""
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump({'files': self.entries}, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Warning: Could not save upload index: {e}")
+
+def file_sha256(file_path, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Hash a file from disk in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def print_progress(filename, sent, total):
+    """Default upload progress reporter"""
+    print(f"  ↑ {filename}: {sent * 100 // total}% ({sent / 1048576:.1f}/{total / 1048576:.1f} MB)")
+
+def iter_file_chunks(file_path, file_size, chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+    """
+    Yield a file from disk in fixed-size chunks so memory stays flat.
+
+    Calls progress(filename, bytes_sent, total) each time another
+    PROGRESS_STEP percent has been read.
+    """
+    filename = os.path.basename(file_path)
+    sent = 0
+    next_report = PROGRESS_STEP
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            sent += len(chunk)
+            yield chunk
+            if progress and file_size and sent * 100 // file_size >= next_report:
+                progress(filename, sent, file_size)
+                next_report = (sent * 100 // file_size) // PROGRESS_STEP * PROGRESS_STEP + PROGRESS_STEP
 
 def load_env():
     """Load environment variables from .env file"""
@@ -24,87 +141,68 @@ def load_env():
                     key, _, value = line.strip().partition('=')
                     os.environ.setdefault(key, value)
 
-def upload_file_to_slack_v2(file_path, channel, initial_comment=None):
-    """Upload a file using new Slack API (v2)"""
-    load_env()
-
-    token = os.environ.get('SLACK_BOT_TOKEN')
-    if not token:
-        print("Error: SLACK_BOT_TOKEN not set")
-        return None
-
-    if not os.path.exists(file_path):
-        print(f"Error: File not found: {file_path}")
-        return None
-
-    filename = os.path.basename(file_path)
-    file_size = os.path.getsize(file_path)
-
-    # Step 1: Get upload URL
+def get_upload_url(token, file_path, file_size):
+    """Step 1: Reserve an upload URL. Returns (upload_url, file_id) or None"""
     params = urllib.parse.urlencode({
-        'filename': filename,
+        'filename': os.path.basename(file_path),
         'length': file_size
     })
 
-    req = urllib.request.Request(
-        f'https://slack.com/api/files.getUploadURLExternal?{params}',
-        headers={'Authorization': f'Bearer {token}'}
-    )
-
     try:
-        response = urllib.request.urlopen(req)
-        result = json.loads(response.read().decode())
+        result = get(
+            f'https://slack.com/api/files.getUploadURLExternal?{params}',
+            headers={'Authorization': f'Bearer {token}'},
+            retries=2
+        ).json()
 
         if not result.get('ok'):
             print(f"✗ Get upload URL error: {result.get('error')}")
             return None
 
-        upload_url = result.get('upload_url')
-        file_id = result.get('file_id')
+        return result.get('upload_url'), result.get('file_id')
 
     except Exception as e:
         print(f"✗ Get upload URL failed: {e}")
         return None
 
-    # Step 2: Upload file to the URL
-    with open(file_path, 'rb') as f:
-        file_content = f.read()
-
-    req = urllib.request.Request(
-        upload_url,
-        data=file_content,
-        method='POST'
-    )
+def send_file(upload_url, file_path, file_size, progress=print_progress):
+    """Step 2: Stream file to the URL (explicit Content-Length, no chunked encoding)"""
+    filename = os.path.basename(file_path)
+    if file_size <= UPLOAD_CHUNK_SIZE:
+        progress = None
 
     try:
-        response = urllib.request.urlopen(req)
+        post(
+            upload_url,
+            data=iter_file_chunks(file_path, file_size, progress=progress),
+            headers={
+                'Content-Type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                'Content-Length': str(file_size)
+            },
+            timeout=120
+        )
         # Upload returns empty 200 on success
+        return True
     except Exception as e:
-        print(f"✗ File upload failed: {e}")
-        return None
-
-    # Step 3: Complete upload and share to channel
-    complete_data = json.dumps({
-        'files': [{'id': file_id, 'title': filename}],
-        'channel_id': channel,
-        'initial_comment': initial_comment or ''
-    }).encode('utf-8')
-
-    req = urllib.request.Request(
-        'https://slack.com/api/files.completeUploadExternal',
-        data=complete_data,
-        headers={
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json; charset=utf-8'
-        }
-    )
+        print(f"✗ File upload failed ({filename}): {e}")
+        return False
 
+def complete_uploads(token, files, channel, initial_comment=None):
+    """Step 3: Complete one or more uploads and share them to channel in one message"""
     try:
-        response = urllib.request.urlopen(req)
-        result = json.loads(response.read().decode())
+        result = post_json(
+            'https://slack.com/api/files.completeUploadExternal',
+            {
+                'files': files,
+                'channel_id': channel,
+                'initial_comment': initial_comment or ''
+            },
+            headers={'Authorization': f'Bearer {token}'}
+        ).json()
 
         if result.get('ok'):
-            print(f"✓ Uploaded: {filename}")
+            for entry in files:
+                print(f"✓ Uploaded: {entry['title']}")
             return result
         else:
             print(f"✗ Complete upload error: {result.get('error')}")
@@ -114,9 +212,158 @@ def upload_file_to_slack_v2(file_path, channel, initial_comment=None):
         print(f"✗ Complete upload failed: {e}")
         return None
 
-def upload_files_with_message(message, files, channel=None):
-    """Upload multiple files with a message"""
+def find_existing(token, index, file_path, channel):
+    """
+    Look a file up in the upload index for channel.
+
+    Returns (sha256, permalink); permalink is None when the file has not been
+    shared to channel before, its Slack copy was deleted, or files.info is
+    not allowed (missing files:read scope).
+    """
+    sha256 = file_sha256(file_path)
+    entry = index.lookup(channel, sha256)
+    if not entry:
+        return sha256, None
+
+    try:
+        params = urllib.parse.urlencode({'file': entry['file_id']})
+        result = get(
+            f'https://slack.com/api/files.info?{params}',
+            headers={'Authorization': f'Bearer {token}'},
+            retries=2
+        ).json()
+    except Exception as e:
+        print(f"Warning: files.info failed, re-uploading {os.path.basename(file_path)}: {e}")
+        return sha256, None
+
+    if result.get('error') == 'missing_scope':
+        print("Warning: files.info needs the files:read scope - uploading without dedup")
+        return sha256, None
+
+    permalink = result.get('file', {}).get('permalink') if result.get('ok') else None
+    if not permalink:
+        index.forget(channel, sha256)
+        return sha256, None
+
+    print(f"= Already uploaded: {os.path.basename(file_path)} ({entry['file_id']})")
+    return sha256, permalink
+
+def share_existing(token, channel, text):
+    """Post a message referencing previously uploaded files"""
+    try:
+        result = post_json(
+            'https://slack.com/api/chat.postMessage',
+            {'channel': channel, 'text': text, 'unfurl_media': True},
+            headers={'Authorization': f'Bearer {token}'}
+        ).json()
+
+        if result.get('ok'):
+            return result
+        print(f"✗ Share existing files error: {result.get('error')}")
+        return None
+
+    except Exception as e:
+        print(f"✗ Share existing files failed: {e}")
+        return None
+
+def with_links(comment, permalinks):
+    """Append file permalinks to a message"""
+    return '\n'.join(filter(None, [comment] + list(permalinks)))
+
+def upload_file_to_slack_v2(file_path, channel, initial_comment=None, progress=print_progress, index=None):
+    """Upload a file using new Slack API (v2), streaming it from disk (deduped when index is given)"""
+    load_env()
+
+    token = os.environ.get('SLACK_BOT_TOKEN')
+    if not token:
+        print("Error: SLACK_BOT_TOKEN not set")
+        return None
+
+    if not os.path.exists(file_path):
+        print(f"Error: File not found: {file_path}")
+        return None
+
+    filename = os.path.basename(file_path)
+    file_size = os.path.getsize(file_path)
+
+    sha256 = None
+    if index is not None:
+        sha256, permalink = find_existing(token, index, file_path, channel)
+        if permalink:
+            return share_existing(token, channel, with_links(initial_comment, [permalink]))
+
+    reserved = get_upload_url(token, file_path, file_size)
+    if not reserved:
+        return None
+    upload_url, file_id = reserved
+
+    if not send_file(upload_url, file_path, file_size, progress):
+        return None
+
+    result = complete_uploads(token, [{'id': file_id, 'title': filename}], channel, initial_comment)
+    if result and sha256:
+        index.record(channel, sha256, file_id, filename, file_size)
+    return result
+
+def upload_files_batch(files, channel, initial_comment=None, workers=UPLOAD_WORKERS, index=None):
+    """
+    Upload several files concurrently and share them in a single message.
+
+    Upload URLs are reserved and file bytes pushed on a thread pool; every
+    file that made it is finalized with one files.completeUploadExternal call
+    carrying the shared initial_comment. Files found in index are not re-sent;
+    their permalinks are appended to the comment instead.
+
+    Returns (result, shared_count)
+    """
+    token = os.environ.get('SLACK_BOT_TOKEN')
+    if not token:
+        print("Error: SLACK_BOT_TOKEN not set")
+        return None, 0
+
+    def upload_one(file_path):
+        if not os.path.exists(file_path):
+            print(f"Error: File not found: {file_path}")
+            return None
+        filename = os.path.basename(file_path)
+        file_size = os.path.getsize(file_path)
+        sha256 = None
+        if index is not None:
+            sha256, permalink = find_existing(token, index, file_path, channel)
+            if permalink:
+                return {'permalink': permalink}
+        reserved = get_upload_url(token, file_path, file_size)
+        if not reserved or not send_file(reserved[0], file_path, file_size):
+            return None
+        return {'id': reserved[1], 'title': filename, 'sha256': sha256, 'size': file_size}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+        # map() keeps the original file order in the shared message
+        done = [entry for entry in pool.map(upload_one, files) if entry]
+
+    if not done:
+        return None, 0
+
+    uploaded = [entry for entry in done if 'id' in entry]
+    comment = with_links(initial_comment, [entry['permalink'] for entry in done if 'permalink' in entry])
+
+    if not uploaded:
+        result = share_existing(token, channel, comment)
+        return result, len(done) if result else 0
+
+    result = complete_uploads(
+        token, [{'id': entry['id'], 'title': entry['title']} for entry in uploaded], channel, comment
+    )
+    if result and index is not None:
+        for entry in uploaded:
+            if entry['sha256']:
+                index.record(channel, entry['sha256'], entry['id'], entry['title'], entry['size'])
+    return result, len(done) if result else 0
+
+def upload_files_with_message(message, files, channel=None, batch=True, dedup=True):
+    """Upload multiple files with a message (batched unless batch=False)"""
     load_env()
+    index = UploadIndex() if dedup else None
 
     target_channel = channel or os.environ.get('SLACK_CHANNEL', 'C09UQGASA2C')
 
@@ -128,31 +375,47 @@ def upload_files_with_message(message, files, channel=None):
     timestamp = datetime.now().strftime('%H:%M')
     formatted_message = f"🤖 *Claude Agent* [{timestamp}]\n{message}"
 
+    if batch:
+        _, success_count = upload_files_batch(files, target_channel, initial_comment=formatted_message, index=index)
+        if index is not None:
+            index.save()
+        print(f"\n✓ Uploaded {success_count}/{len(files)} files to {target_channel}")
+        return success_count == len(files)
+
     success_count = 0
     first_upload = True
 
     for file_path in files:
         # Only add comment to first file
         comment = formatted_message if first_upload else None
-        result = upload_file_to_slack_v2(file_path, target_channel, initial_comment=comment)
+        result = upload_file_to_slack_v2(file_path, target_channel, initial_comment=comment, index=index)
         if result:
             success_count += 1
         first_upload = False
 
+    if index is not None:
+        index.save()
+
     print(f"\n✓ Uploaded {success_count}/{len(files)} files to {target_channel}")
     return success_count == len(files)
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
-        print("Usage: python3 scripts/slack-upload.py \"message\" file1.png [file2.png ...] [channel]")
+        print("Usage: python3 scripts/slack-upload.py \"message\" file1.png [file2.png ...] [channel] [--sequential] [--no-dedup]")
         sys.exit(1)
 
     message = sys.argv[1]
     files = []
     channel = None
+    batch = True
+    dedup = True
 
     for arg in sys.argv[2:]:
-        if arg.startswith('#') or arg.startswith('C') or arg.startswith('U'):
+        if arg == '--sequential':
+            batch = False
+        elif arg == '--no-dedup':
+            dedup = False
+        elif arg.startswith('#') or arg.startswith('C') or arg.startswith('U'):
             channel = arg
         elif os.path.exists(arg):
             files.append(arg)
@@ -167,5 +430,5 @@ if __name__ == '__main__':
         print("Error: No valid files found")
         sys.exit(1)
 
-    success = upload_files_with_message(message, files, channel)
+    success = upload_files_with_message(message, files, channel, batch=batch, dedup=dedup)
     sys.exit(0 if success else 1)
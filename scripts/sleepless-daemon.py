@@ -9,6 +9,7 @@ Features:
     - /sleepless [query] - Run Claude Code CLI commands
     - @sleepless mentions - Direct mentions in channels
     - Thread conversations - Reply in threads to continue conversations
+    - Streaming responses (SLEEPLESS_CLI_STREAMING=1) - Live-edited Slack message as the CLI writes
     - Multi-LLM Review - Automatic review after 1hr user inactivity
     - /sleepless status - Check daemon status
     - /sleepless relay - Bot-to-bot relay (blocked on free Slack)
@@ -16,7 +17,9 @@ Features:
 Multi-LLM Review System:
     - Triggers after 1 hour of user inactivity in a thread
     - Waterfall: Ollama (local) → Gemini (free) → Groq (free)
+    - Optional hedged mode (SLEEPLESS_REVIEW_LLM_MODE=hedged): staggered parallel tiers
     - 15-minute max runtime with circuit breaker
+    - Parallel review workers with per-tier token-bucket rate limits
     - Max 3 reviews per thread, 10 per day
     - Exponential backoff between reviews
 
@@ -35,14 +38,20 @@ import threading
 import time
 import signal
 import re
-import urllib.request
+import queue
+import heapq
+import uuid
 import urllib.error
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from http_transport import post_json
+from conversation_store import create_conversation_store
+from llm_cache import LLMCache
 
 # Slack Bolt imports
 try:
@@ -60,9 +69,22 @@ except ImportError:
 
 HEARTBEAT_INTERVAL = 30  # seconds
 CLI_TIMEOUT = 120  # seconds - max time for Claude CLI response
+CLI_STREAMING = os.environ.get('SLEEPLESS_CLI_STREAMING', '0') == '1'  # Stream CLI output into Slack via message edits
+CLI_STREAM_ARGS = ['--output-format', 'stream-json', '--verbose', '--include-partial-messages']
+CLI_STREAM_EDIT_INTERVAL = 1.5  # seconds - min time between chat_update edits (Slack tier 3 ≈ 50/min)
+CLI_STREAM_PREVIEW_CHARS = 3000  # max chars shown in a partial (in-progress) message
+CLI_SESSION_REUSE = os.environ.get('SLEEPLESS_CLI_SESSIONS', '1') == '1'  # Resume one CLI session per thread
 LOG_FILE = None  # Set to path for file logging
 MAX_CONVERSATION_HISTORY = 10  # Max messages to keep per thread
 CONVERSATION_TIMEOUT = 3600  # 1 hour - clear old conversations
+CONVERSATION_STORE = os.environ.get('SLEEPLESS_CONVERSATION_STORE', 'sqlite')  # 'sqlite' (survives restarts) or 'memory'
+
+# Command Worker Pool
+WORKER_MAX_CONCURRENCY = int(os.environ.get('SLEEPLESS_MAX_CONCURRENCY', '3'))  # concurrent handler jobs (CLI processes)
+WORKER_QUEUE_MAX = 20  # max queued jobs before new requests are rejected
+PRIORITY_READ_ONLY = 0  # status / read-only improve commands
+PRIORITY_COMMAND = 1  # yc commands
+PRIORITY_CLI = 2  # Claude CLI calls and improvement executions
 
 # Connection Health Watchdog
 HEALTH_CHECK_INTERVAL = 60  # seconds between Slack API health checks
@@ -73,10 +95,26 @@ REVIEW_INACTIVITY_THRESHOLD = 3600  # 1 hour before triggering review
 REVIEW_MAX_RUNTIME = 900  # 15 minutes max for review process
 REVIEW_MAX_PER_THREAD = 3  # Max reviews per thread
 REVIEW_MAX_PER_DAY = 10  # Max reviews per day (global)
-REVIEW_CHECK_INTERVAL = 300  # Check for inactive threads every 5 min
+REVIEW_CHECK_INTERVAL = 300  # Re-check interval while circuit breaker is open / daily limit reached
 REVIEW_BACKOFF_MULTIPLIER = 2  # Exponential backoff multiplier
+REVIEW_WORKERS = 3  # Concurrent reviews (throughput is bounded by per-tier rate limits)
+REVIEW_QUEUE_MAX = 50  # Max reviews waiting for a worker
+REVIEW_RATE_LIMIT_MAX_WAIT = 30  # seconds to wait for a tier's rate-limit token before skipping it
+REVIEW_CACHE_ENABLED = True  # Reuse review responses for identical prompts
+REVIEW_CACHE_TTL = 86400  # 24 hours
+REVIEW_CACHE_MAX_ENTRIES = 500
+
+# Retries (with jittered backoff) on connection errors / 429 / 5xx for hosted LLM APIs
+LLM_HTTP_RETRIES = 1
+
+# LLM call mode: 'waterfall' (strictly serial) or 'hedged' (start the next
+# tier after its hedge_delay, return the first successful response)
+REVIEW_LLM_MODE = os.environ.get('SLEEPLESS_REVIEW_LLM_MODE', 'waterfall')
 
 # LLM Tier Configuration (waterfall order)
+# priority: lower runs first; hedge_delay: seconds after the previous tier
+# started before this one is launched in hedged mode (ignored in waterfall)
+# rate_per_min / burst: token-bucket request limit per tier (provider quota)
 LLM_TIERS = [
     {
         'name': 'ollama',
@@ -84,6 +122,10 @@ LLM_TIERS = [
         'endpoint': 'http://localhost:11434/api/generate',
         'timeout': 120,
         'enabled': True,
+        'priority': 0,
+        'hedge_delay': 0,
+        'rate_per_min': 6,  # local model: roughly one generation at a time
+        'burst': 1,
     },
     {
         'name': 'gemini',
@@ -92,6 +134,10 @@ LLM_TIERS = [
         'timeout': 60,
         'enabled': True,
         'env_key': 'GEMINI_API_KEY',
+        'priority': 1,
+        'hedge_delay': 15,
+        'rate_per_min': 15,  # free tier RPM
+        'burst': 3,
     },
     {
         'name': 'groq',
@@ -100,6 +146,10 @@ LLM_TIERS = [
         'timeout': 30,
         'enabled': True,
         'env_key': 'GROQ_API_KEY',
+        'priority': 2,
+        'hedge_delay': 15,
+        'rate_per_min': 30,  # free tier RPM
+        'burst': 5,
     },
 ]
 
@@ -107,23 +157,26 @@ LLM_TIERS = [
 LOCAL_HEARTBEAT_DIR = Path.home() / 'Library' / 'Application Support' / 'yellowcircle' / 'sleepless'
 CIRCUIT_BREAKER_FILE = LOCAL_HEARTBEAT_DIR / 'circuit-breaker.json'
 REVIEW_STATS_FILE = LOCAL_HEARTBEAT_DIR / 'review-stats.json'
+CONVERSATION_DB_FILE = LOCAL_HEARTBEAT_DIR / 'conversations.db'
+LLM_CACHE_FILE = LOCAL_HEARTBEAT_DIR / 'llm-cache.db'
 
 # ============================================================
 # Thread Storage
 # ============================================================
 
-# Thread conversation storage
-# Format: {thread_ts: {'messages': [...], 'last_activity': timestamp, 'channel': channel_id,
-#                      'last_user_activity': timestamp, 'review_count': int, 'next_review_delay': int}}
-thread_conversations = defaultdict(lambda: {
-    'messages': [],
-    'last_activity': 0,
-    'channel': None,
-    'last_user_activity': 0,
-    'review_count': 0,
-    'next_review_delay': REVIEW_INACTIVITY_THRESHOLD,
-})
-conversations_lock = threading.Lock()
+# Thread conversation storage (see conversation_store.py)
+# Record format: {'thread_ts': str, 'messages': [...], 'last_activity': timestamp, 'channel': channel_id,
+#                 'last_user_activity': timestamp, 'review_count': int, 'next_review_delay': int}
+# Opened in main() (after any daemon fork) by init_conversation_store()
+conversation_store = None
+
+# Review LLM response cache (opened in main() by init_llm_cache())
+llm_cache = None
+
+# Claude CLI sessions (one resumable session per thread)
+# Format: {thread_ts: {'session_id': uuid, 'turns': int, 'last_used': timestamp, 'lock': Lock}}
+cli_sessions = {}
+cli_sessions_lock = threading.Lock()
 
 # Global review stats
 review_stats = {
@@ -132,6 +185,7 @@ review_stats = {
     'last_review': None,
 }
 review_stats_lock = threading.Lock()
+reviews_in_flight = set()  # thread_ts values with a review currently running
 
 # Improve command deduplication: prevent concurrent execution commands
 _improve_running = False
@@ -188,6 +242,8 @@ def write_heartbeat(status='running'):
         with review_stats_lock:
             daily_reviews = review_stats.get('count', 0)
 
+        next_due = review_scheduler.next_due()
+
         heartbeat = {
             'daemon': 'sleepless',
             'machine': os.uname().nodename,
@@ -201,7 +257,15 @@ def write_heartbeat(status='running'):
                 'daily_count': daily_reviews,
                 'max_daily': REVIEW_MAX_PER_DAY,
                 'circuit_breaker': is_circuit_breaker_open(),
-            }
+            },
+            'worker_pool': command_pool.stats(),
+            'cli_sessions': len(cli_sessions),
+            'review_pool': review_pool.stats(),
+            'llm_cache': llm_cache.stats() if llm_cache else None,
+            'review_schedule': {
+                'pending': len(review_scheduler),
+                'next_due_in': round(next_due - time.time(), 1) if next_due else None,
+            },
         }
         with open(heartbeat_file, 'w') as f:
             json.dump(heartbeat, f, indent=2)
@@ -299,109 +363,239 @@ def can_do_review():
         return review_stats.get('count', 0) < REVIEW_MAX_PER_DAY
 
 
-def increment_review_count():
-    """Increment daily review count"""
+def claim_review(thread_ts):
+    """
+    Atomically reserve a review for a thread.
+    Takes one slot of the daily limit and checks the per-thread limit, so
+    concurrent review workers can never exceed either.
+    Returns True if the review may proceed.
+    """
     with review_stats_lock:
+        if thread_ts in reviews_in_flight:
+            return False
+
+        conv = conversation_store.get(thread_ts)
+        if not conv or conv.get('review_count', 0) >= REVIEW_MAX_PER_THREAD:
+            return False
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        if review_stats.get('today') != today:
+            review_stats['today'] = today
+            review_stats['count'] = 0
+        if review_stats.get('count', 0) >= REVIEW_MAX_PER_DAY:
+            return False
+
         review_stats['count'] = review_stats.get('count', 0) + 1
         review_stats['last_review'] = datetime.now().isoformat()
+        reviews_in_flight.add(thread_ts)
         save_review_stats()
+        return True
+
+
+def release_review(thread_ts, posted):
+    """Release a claim from claim_review(), refunding the daily slot if nothing was posted"""
+    with review_stats_lock:
+        reviews_in_flight.discard(thread_ts)
+        if not posted:
+            review_stats['count'] = max(0, review_stats.get('count', 0) - 1)
+            save_review_stats()
 
 
 # ============================================================
 # Conversation Management
 # ============================================================
 
+def init_conversation_store():
+    """Open the configured conversation store"""
+    global conversation_store
+    conversation_store = create_conversation_store(
+        CONVERSATION_STORE,
+        CONVERSATION_DB_FILE,
+        MAX_CONVERSATION_HISTORY,
+        REVIEW_INACTIVITY_THRESHOLD,
+    )
+    log(f'Conversation store: {CONVERSATION_STORE} ({conversation_store.count_active()} active threads)')
+
+
 def cleanup_old_conversations():
     """Remove conversations older than CONVERSATION_TIMEOUT"""
-    with conversations_lock:
-        current_time = time.time()
-        expired = [ts for ts, conv in thread_conversations.items()
-                   if current_time - conv['last_activity'] > CONVERSATION_TIMEOUT * 2]  # 2x for cleanup
-        for ts in expired:
-            del thread_conversations[ts]
-        if expired:
-            log(f'Cleaned up {len(expired)} expired conversations')
+    expired = conversation_store.delete_inactive(time.time() - CONVERSATION_TIMEOUT * 2)  # 2x for cleanup
+    if expired:
+        log(f'Cleaned up {expired} expired conversations')
 
 
 def add_to_conversation(thread_ts, role, content, channel=None, is_user=False):
     """Add a message to thread conversation history"""
-    with conversations_lock:
-        conv = thread_conversations[thread_ts]
-        conv['messages'].append({'role': role, 'content': content, 'time': time.time()})
-        conv['last_activity'] = time.time()
-        if is_user:
-            conv['last_user_activity'] = time.time()
-            # Reset review delay on user activity
-            conv['next_review_delay'] = REVIEW_INACTIVITY_THRESHOLD
-        if channel:
-            conv['channel'] = channel
-        # Trim to max history
-        if len(conv['messages']) > MAX_CONVERSATION_HISTORY:
-            conv['messages'] = conv['messages'][-MAX_CONVERSATION_HISTORY:]
+    schedule_review(conversation_store.add_message(thread_ts, role, content, channel=channel, is_user=is_user))
 
 
-def get_conversation_context(thread_ts):
-    """Get conversation history as context string"""
-    with conversations_lock:
-        conv = thread_conversations.get(thread_ts)
-        if not conv or not conv['messages']:
-            return None
+def format_conversation_context(conv):
+    """Format a conversation's messages as a context string"""
+    if not conv or not conv['messages']:
+        return None
+
+    context_parts = []
+    for msg in conv['messages']:
+        role = "User" if msg['role'] == 'user' else "Assistant"
+        context_parts.append(f"{role}: {msg['content']}")
 
-        context_parts = []
-        for msg in conv['messages']:
-            role = "User" if msg['role'] == 'user' else "Assistant"
-            context_parts.append(f"{role}: {msg['content']}")
+    return "\n".join(context_parts)
 
-        return "\n".join(context_parts)
+
+def get_conversation_context(thread_ts):
+    """Get conversation history as context string"""
+    return format_conversation_context(conversation_store.get(thread_ts))
 
 
 def is_sleepless_thread(thread_ts):
     """Check if sleepless has participated in this thread"""
-    with conversations_lock:
-        return thread_ts in thread_conversations and len(thread_conversations[thread_ts]['messages']) > 0
+    return conversation_store.has_messages(thread_ts)
 
 
-def get_threads_needing_review():
-    """Get threads that need review (inactive for threshold period)"""
-    threads_to_review = []
-    current_time = time.time()
+def review_due_at(conv):
+    """Get the time a conversation is next due for review, or None if it isn't reviewable"""
+    if not conv or not conv['messages'] or not conv['channel']:
+        return None
+    if conv.get('review_count', 0) >= REVIEW_MAX_PER_THREAD:
+        return None
+    # Only review after an assistant response (not pending user messages or prior reviews)
+    if conv['messages'][-1]['role'] != 'assistant':
+        return None
+    last_user = conv.get('last_user_activity') or conv['last_activity']
+    return last_user + conv.get('next_review_delay', REVIEW_INACTIVITY_THRESHOLD)
 
-    with conversations_lock:
-        for thread_ts, conv in thread_conversations.items():
-            # Skip if no messages or no channel
-            if not conv['messages'] or not conv['channel']:
-                continue
 
-            # Skip if max reviews reached for this thread
-            if conv.get('review_count', 0) >= REVIEW_MAX_PER_THREAD:
-                continue
+def schedule_review(conv):
+    """(Re)schedule or cancel a conversation's review deadline"""
+    if not conv:
+        return
+    due_at = review_due_at(conv)
+    if due_at is None:
+        review_scheduler.cancel(conv['thread_ts'])
+    else:
+        review_scheduler.schedule(conv['thread_ts'], due_at)
 
-            # Check inactivity threshold (with backoff)
-            threshold = conv.get('next_review_delay', REVIEW_INACTIVITY_THRESHOLD)
-            last_user = conv.get('last_user_activity', conv['last_activity'])
 
-            if current_time - last_user >= threshold:
-                # Check if last message was from assistant (avoid reviewing user messages)
-                if conv['messages'] and conv['messages'][-1]['role'] == 'assistant':
-                    threads_to_review.append({
-                        'thread_ts': thread_ts,
-                        'channel': conv['channel'],
-                        'context': get_conversation_context(thread_ts),
-                        'review_count': conv.get('review_count', 0),
-                    })
+def get_threads_needing_review():
+    """Pop threads whose review deadline has passed (re-validated against the store)"""
+    threads_to_review = []
+    current_time = time.time()
+
+    for thread_ts in review_scheduler.pop_due(current_time):
+        conv = conversation_store.get(thread_ts)
+        due_at = review_due_at(conv)
+        if due_at is None:
+            continue
+        if due_at > current_time:
+            review_scheduler.schedule(thread_ts, due_at)
+            continue
+        threads_to_review.append({
+            'thread_ts': thread_ts,
+            'channel': conv['channel'],
+            'context': format_conversation_context(conv),
+            'review_count': conv.get('review_count', 0),
+        })
 
     return threads_to_review
 
 
 def mark_thread_reviewed(thread_ts):
     """Mark thread as reviewed and update backoff"""
-    with conversations_lock:
-        if thread_ts in thread_conversations:
-            conv = thread_conversations[thread_ts]
-            conv['review_count'] = conv.get('review_count', 0) + 1
-            # Exponential backoff for next review
-            current_delay = conv.get('next_review_delay', REVIEW_INACTIVITY_THRESHOLD)
-            conv['next_review_delay'] = min(current_delay * REVIEW_BACKOFF_MULTIPLIER, 86400)  # Max 24hr
+    schedule_review(conversation_store.mark_reviewed(thread_ts, REVIEW_BACKOFF_MULTIPLIER, 86400))  # Max 24hr
+
+
+# ============================================================
+# Review Scheduler
+# ============================================================
+
+class ReviewScheduler:
+    """
+    Deadline heap of pending thread reviews.
+
+    schedule()/cancel() are O(log n) (stale heap entries are skipped lazily
+    on pop), and wait() sleeps exactly until the earliest deadline or until
+    woken by a new earlier deadline / shutdown.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._due = {}
+        self._cond = threading.Condition()
+
+    def schedule(self, thread_ts, due_at):
+        """Set a thread's review deadline"""
+        with self._cond:
+            if self._due.get(thread_ts) == due_at:
+                return
+            self._due[thread_ts] = due_at
+            heapq.heappush(self._heap, (due_at, thread_ts))
+            if self._heap[0] == (due_at, thread_ts):
+                self._cond.notify_all()
+
+    def cancel(self, thread_ts):
+        """Remove a thread's review deadline"""
+        with self._cond:
+            self._due.pop(thread_ts, None)
+
+    def _discard_stale(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Get the earliest deadline, or None if nothing is scheduled"""
+        with self._cond:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return all threads due at or before now (earliest first)"""
+        due = []
+        with self._cond:
+            self._discard_stale()
+            while self._heap and self._heap[0][0] <= now:
+                _, thread_ts = heapq.heappop(self._heap)
+                del self._due[thread_ts]
+                due.append(thread_ts)
+                self._discard_stale()
+        return due
+
+    def wait(self, stop_event):
+        """Block until a deadline passes or stop_event is set"""
+        with self._cond:
+            while not stop_event.is_set():
+                self._discard_stale()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    return
+                self._cond.wait(delay)
+
+    def wake(self):
+        """Wake any waiter (e.g. on shutdown)"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._due)
+
+
+review_scheduler = ReviewScheduler()
+
+
+def load_review_schedule():
+    """Schedule reviews for every reviewable thread in the store (startup)"""
+    for conv in conversation_store.review_candidates(REVIEW_MAX_PER_THREAD):
+        schedule_review(conv)
+    log(f'Review schedule loaded: {len(review_scheduler)} pending review(s)')
+
+
+def stop_review_loop():
+    """Signal the review loop to stop"""
+    review_stop_event.set()
+    review_scheduler.wake()
 
 
 # ============================================================
@@ -411,22 +605,16 @@ def mark_thread_reviewed(thread_ts):
 def call_ollama(prompt, model='llama3.2', timeout=120):
     """Call local Ollama instance"""
     try:
-        data = json.dumps({
-            'model': model,
-            'prompt': prompt,
-            'stream': False,
-        }).encode('utf-8')
-
-        req = urllib.request.Request(
+        result = post_json(
             'http://localhost:11434/api/generate',
-            data=data,
-            headers={'Content-Type': 'application/json'},
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            return result.get('response', '')
+            {
+                'model': model,
+                'prompt': prompt,
+                'stream': False,
+            },
+            timeout=timeout,
+        ).json()
+        return result.get('response', '')
     except urllib.error.URLError as e:
         log(f'Ollama connection failed: {e}', 'WARN')
         return None
@@ -435,97 +623,138 @@ def call_ollama(prompt, model='llama3.2', timeout=120):
         return None
 
 
-def call_gemini(prompt, api_key, model='gemini-1.5-flash', timeout=60):
+def call_gemini(prompt, api_key, model='gemini-1.5-flash', timeout=60, retries=LLM_HTTP_RETRIES):
     """Call Google Gemini API"""
     try:
         url = f'https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}'
-        data = json.dumps({
-            'contents': [{'parts': [{'text': prompt}]}],
-            'generationConfig': {'maxOutputTokens': 2048},
-        }).encode('utf-8')
-
-        req = urllib.request.Request(
+        result = post_json(
             url,
-            data=data,
-            headers={'Content-Type': 'application/json'},
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            candidates = result.get('candidates', [])
-            if candidates:
-                content = candidates[0].get('content', {})
-                parts = content.get('parts', [])
-                if parts:
-                    return parts[0].get('text', '')
+            {
+                'contents': [{'parts': [{'text': prompt}]}],
+                'generationConfig': {'maxOutputTokens': 2048},
+            },
+            timeout=timeout,
+            retries=retries,
+        ).json()
+        candidates = result.get('candidates', [])
+        if candidates:
+            content = candidates[0].get('content', {})
+            parts = content.get('parts', [])
+            if parts:
+                return parts[0].get('text', '')
         return None
     except Exception as e:
         log(f'Gemini error: {e}', 'ERROR')
         return None
 
 
-def call_groq(prompt, api_key, model='llama-3.1-70b-versatile', timeout=30):
+def call_groq(prompt, api_key, model='llama-3.1-70b-versatile', timeout=30, retries=LLM_HTTP_RETRIES):
     """Call Groq API (OpenAI-compatible)"""
     try:
-        data = json.dumps({
-            'model': model,
-            'messages': [{'role': 'user', 'content': prompt}],
-            'max_tokens': 2048,
-        }).encode('utf-8')
-
-        req = urllib.request.Request(
+        result = post_json(
             'https://api.groq.com/openai/v1/chat/completions',
-            data=data,
-            headers={
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {api_key}',
+            {
+                'model': model,
+                'messages': [{'role': 'user', 'content': prompt}],
+                'max_tokens': 2048,
             },
-            method='POST'
-        )
-
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            choices = result.get('choices', [])
-            if choices:
-                return choices[0].get('message', {}).get('content', '')
+            headers={'Authorization': f'Bearer {api_key}'},
+            timeout=timeout,
+            retries=retries,
+        ).json()
+        choices = result.get('choices', [])
+        if choices:
+            return choices[0].get('message', {}).get('content', '')
         return None
     except Exception as e:
         log(f'Groq error: {e}', 'ERROR')
         return None
 
 
-def call_review_llm(prompt):
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate_per_sec, capacity):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait):
+        """Take one token, waiting up to max_wait seconds. Returns True on success."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# Per-tier request rate limiters (from LLM_TIERS rate_per_min / burst)
+llm_rate_limiters = {
+    tier['name']: TokenBucket(tier['rate_per_min'] / 60.0, tier.get('burst', 1))
+    for tier in LLM_TIERS if tier.get('rate_per_min')
+}
+
+
+def call_llm_tier(tier, prompt, retries=LLM_HTTP_RETRIES):
+    """
+    Call a single LLM tier (subject to its rate limit).
+    retries: HTTP retries for the API tiers (the hedged path passes 0 so each
+    tier finishes within its own timeout).
+    Returns the response text, or None if the tier failed or was skipped.
+    """
+    name = tier['name']
+
+    limiter = llm_rate_limiters.get(name)
+    if limiter and not limiter.acquire(REVIEW_RATE_LIMIT_MAX_WAIT):
+        log(f'{name} rate limit reached, skipping', 'WARN')
+        return None
+
+    if name == 'ollama':
+        return call_ollama(prompt, tier.get('model', 'llama3.2'), tier.get('timeout', 120))
+    elif name == 'gemini':
+        api_key = os.environ.get(tier.get('env_key', 'GEMINI_API_KEY'))
+        if not api_key:
+            log(f'Gemini API key not found, skipping', 'WARN')
+            return None
+        return call_gemini(prompt, api_key, tier.get('model'), tier.get('timeout', 60), retries)
+    elif name == 'groq':
+        api_key = os.environ.get(tier.get('env_key', 'GROQ_API_KEY'))
+        if not api_key:
+            log(f'Groq API key not found, skipping', 'WARN')
+            return None
+        return call_groq(prompt, api_key, tier.get('model'), tier.get('timeout', 30), retries)
+
+    return None
+
+
+def get_enabled_tiers():
+    """Get enabled LLM tiers sorted by priority (config order breaks ties)"""
+    tiers = [t for t in LLM_TIERS if t.get('enabled', True)]
+    return sorted(tiers, key=lambda t: t.get('priority', 0))
+
+
+def call_review_llm_waterfall(prompt):
     """
     Call LLM using waterfall pattern.
     Tries each tier until one succeeds.
     Returns tuple: (response, llm_name) or (None, None)
     """
-    for tier in LLM_TIERS:
-        if not tier.get('enabled', True):
-            continue
-
+    for tier in get_enabled_tiers():
         name = tier['name']
         log(f'Trying {name} for review...')
 
         try:
-            if name == 'ollama':
-                response = call_ollama(prompt, tier.get('model', 'llama3.2'), tier.get('timeout', 120))
-            elif name == 'gemini':
-                api_key = os.environ.get(tier.get('env_key', 'GEMINI_API_KEY'))
-                if not api_key:
-                    log(f'Gemini API key not found, skipping', 'WARN')
-                    continue
-                response = call_gemini(prompt, api_key, tier.get('model'), tier.get('timeout', 60))
-            elif name == 'groq':
-                api_key = os.environ.get(tier.get('env_key', 'GROQ_API_KEY'))
-                if not api_key:
-                    log(f'Groq API key not found, skipping', 'WARN')
-                    continue
-                response = call_groq(prompt, api_key, tier.get('model'), tier.get('timeout', 30))
-            else:
-                continue
-
+            response = call_llm_tier(tier, prompt)
             if response:
                 log(f'{name} responded successfully')
                 return response, name
@@ -537,6 +766,108 @@ def call_review_llm(prompt):
     return None, None
 
 
+def call_review_llm_hedged(prompt):
+    """
+    Call LLM tiers concurrently with staggered starts.
+
+    Each tier is launched hedge_delay seconds after the previous one, or
+    immediately once every running tier has failed. The first successful
+    response wins; slower tiers are left to finish in the background and
+    their results are ignored.
+    Returns tuple: (response, llm_name) or (None, None)
+    """
+    tiers = get_enabled_tiers()
+    if not tiers:
+        return None, None
+
+    results = queue.Queue()
+
+    # No HTTP retries inside a tier: the next tier is the hedge, and the
+    # deadline below assumes one attempt per tier timeout
+    def run_tier(tier):
+        try:
+            response = call_llm_tier(tier, prompt, retries=0)
+        except Exception as e:
+            log(f'{tier["name"]} failed: {e}', 'ERROR')
+            response = None
+        results.put((tier['name'], response))
+
+    # Overall deadline: no tier can outlive its own timeout
+    deadline = time.time() + sum(t.get('hedge_delay', 0) for t in tiers) + max(t.get('timeout', 60) for t in tiers)
+    started = 0
+    pending = 0
+    next_start = time.time()
+
+    while started < len(tiers) or pending:
+        now = time.time()
+        if now >= deadline:
+            break
+
+        # Launch the next tier when its hedge delay expires or nothing is running
+        if started < len(tiers) and (now >= next_start or not pending):
+            tier = tiers[started]
+            log(f'Trying {tier["name"]} for review (hedged)...')
+            threading.Thread(target=run_tier, args=(tier,), daemon=True).start()
+            started += 1
+            pending += 1
+            if started < len(tiers):
+                next_start = time.time() + tiers[started].get('hedge_delay', 0)
+            continue
+
+        wait_until = next_start if started < len(tiers) else deadline
+        try:
+            name, response = results.get(timeout=max(0.0, min(wait_until, deadline) - now))
+        except queue.Empty:
+            continue
+
+        pending -= 1
+        if response:
+            log(f'{name} responded successfully')
+            return response, name
+
+    return None, None
+
+
+def init_llm_cache():
+    """Open the review response cache"""
+    global llm_cache
+    if not REVIEW_CACHE_ENABLED:
+        return
+    try:
+        llm_cache = LLMCache(LLM_CACHE_FILE, REVIEW_CACHE_TTL, REVIEW_CACHE_MAX_ENTRIES)
+    except Exception as e:
+        log(f'LLM cache unavailable: {e}', 'WARN')
+
+
+def call_review_llm(prompt):
+    """
+    Call review LLM using the configured REVIEW_LLM_MODE.
+    Identical (normalized) prompts are served from the response cache, keyed
+    by the model of the tier that answered; lookups try the enabled tiers in
+    priority order, so a disabled or re-pointed tier's reviews are not reused.
+    Returns tuple: (response, llm_name) or (None, None)
+    """
+    tiers = get_enabled_tiers()
+    if llm_cache:
+        for tier in tiers:
+            cached = llm_cache.get(tier['model'], prompt)
+            if cached:
+                response, source = cached
+                log(f'Review cache hit ({source}, {tier["model"]})')
+                return response, f'{source}, cached'
+
+    if REVIEW_LLM_MODE == 'hedged':
+        response, llm_name = call_review_llm_hedged(prompt)
+    else:
+        response, llm_name = call_review_llm_waterfall(prompt)
+
+    if response and llm_cache:
+        tier = next((t for t in tiers if t['name'] == llm_name), None)
+        if tier:
+            llm_cache.put(tier['model'], prompt, response, source=llm_name)
+    return response, llm_name
+
+
 # ============================================================
 # Review Process
 # ============================================================
@@ -571,14 +902,13 @@ def perform_review(thread_info):
     context = thread_info['context']
 
     # Get last assistant message
-    with conversations_lock:
-        conv = thread_conversations.get(thread_ts, {})
-        messages = conv.get('messages', [])
-        last_assistant_msg = None
-        for msg in reversed(messages):
-            if msg['role'] == 'assistant':
-                last_assistant_msg = msg['content']
-                break
+    conv = conversation_store.get(thread_ts) or {}
+    messages = conv.get('messages', [])
+    last_assistant_msg = None
+    for msg in reversed(messages):
+        if msg['role'] == 'assistant':
+            last_assistant_msg = msg['content']
+            break
 
     if not last_assistant_msg:
         log(f'No assistant message found in thread {thread_ts}', 'WARN')
@@ -608,8 +938,9 @@ def perform_review(thread_info):
 
             # Add review to conversation history
             add_to_conversation(thread_ts, 'reviewer', review_response, channel)
+            # A resumed session only gets the new prompt and would never see the review
+            drop_cli_session(thread_ts)
             mark_thread_reviewed(thread_ts)
-            increment_review_count()
 
             log(f'Review posted to thread {thread_ts} via {llm_name}')
             return True
@@ -619,12 +950,49 @@ def perform_review(thread_info):
     return False
 
 
+def defer_review(thread_ts, delay=REVIEW_CHECK_INTERVAL):
+    """Push a due review back onto the schedule"""
+    review_scheduler.schedule(thread_ts, time.time() + delay)
+
+
+def run_review_job(thread_info, deadline):
+    """Review worker job: claim limits, run the review, release the claim"""
+    thread_ts = thread_info['thread_ts']
+
+    if review_stop_event.is_set():
+        return
+    if time.time() > deadline:
+        log(f'Review runtime limit reached (15min), deferring {thread_ts}', 'WARN')
+        defer_review(thread_ts)
+        return
+    if is_circuit_breaker_open():
+        defer_review(thread_ts)
+        return
+    if not claim_review(thread_ts):
+        # Retry later if the daily limit was hit; threads at their own limit
+        # (or already being reviewed) are simply dropped
+        if not can_do_review():
+            defer_review(thread_ts)
+        return
+
+    posted = False
+    try:
+        posted = perform_review(thread_info)
+    finally:
+        release_review(thread_ts, posted)
+
+    if not posted:
+        # Failed reviews retry after the check interval instead of immediately
+        defer_review(thread_ts)
+
+
 def review_loop():
-    """Background loop to check for threads needing review"""
+    """Background loop that reviews threads as their inactivity deadlines expire"""
     global review_thread_running
     review_thread_running = True
 
     log('Review loop started')
+    load_review_schedule()
 
     while not review_stop_event.is_set():
         try:
@@ -640,41 +1008,32 @@ def review_loop():
                 review_stop_event.wait(REVIEW_CHECK_INTERVAL)
                 continue
 
-            # Find threads needing review
+            # Sleep until the earliest review deadline
+            review_scheduler.wait(review_stop_event)
+            if review_stop_event.is_set():
+                break
+
             threads = get_threads_needing_review()
 
             if threads:
                 log(f'Found {len(threads)} thread(s) needing review')
 
-                # Process one thread at a time with timeout
-                start_time = time.time()
+                # Hand the batch to the review workers; reviews not started
+                # within REVIEW_MAX_RUNTIME are deferred
+                deadline = time.time() + REVIEW_MAX_RUNTIME
                 for thread_info in threads:
-                    # Check runtime limit
-                    if time.time() - start_time > REVIEW_MAX_RUNTIME:
-                        log('Review runtime limit reached (15min)', 'WARN')
-                        break
-
-                    # Check circuit breaker again
-                    if is_circuit_breaker_open():
-                        break
-
-                    # Check daily limit again
-                    if not can_do_review():
-                        break
-
-                    # Perform review
-                    perform_review(thread_info)
-
-                    # Small delay between reviews
-                    time.sleep(5)
+                    position = review_pool.submit(
+                        lambda info=thread_info: run_review_job(info, deadline),
+                        label=f'review {thread_info["thread_ts"]}',
+                    )
+                    if position is None:
+                        defer_review(thread_info['thread_ts'])
 
         except Exception as e:
             log(f'Review loop error: {e}', 'ERROR')
             # Open circuit breaker on repeated errors
             open_circuit_breaker(f'Review loop error: {e}', duration_hours=1)
-
-        # Wait for next check
-        review_stop_event.wait(REVIEW_CHECK_INTERVAL)
+            review_stop_event.wait(REVIEW_CHECK_INTERVAL)
 
     review_thread_running = False
     log('Review loop stopped')
@@ -684,25 +1043,122 @@ def review_loop():
 # Claude CLI Integration
 # ============================================================
 
-def call_claude_cli(prompt, context=None, timeout=CLI_TIMEOUT):
-    """
-    Invoke Claude Code CLI and return response.
-    """
-    try:
-        if context:
-            full_prompt = f"""Previous conversation context:
+def build_cli_prompt(prompt, context=None):
+    """Build the full CLI prompt, prefixing conversation context if any"""
+    if context:
+        return f"""Previous conversation context:
 {context}
 
 Current question/request:
 {prompt}
 
 Please respond considering the conversation context above."""
+    return prompt
+
+
+def get_cli_session(session_key):
+    """Get or create the CLI session record for a thread"""
+    with cli_sessions_lock:
+        session = cli_sessions.get(session_key)
+        if session is None:
+            session = {
+                'session_id': str(uuid.uuid4()),
+                'turns': 0,
+                'last_used': time.time(),
+                'lock': threading.Lock(),
+            }
+            cli_sessions[session_key] = session
+        return session
+
+
+def rebind_cli_session(old_key, new_key):
+    """Move a session to a new key (e.g. once a slash command's reply ts is known)"""
+    with cli_sessions_lock:
+        session = cli_sessions.pop(old_key, None)
+        if session is not None and new_key:
+            cli_sessions[new_key] = session
+
+
+def drop_cli_session(session_key):
+    """
+    Forget a thread's CLI session so its next turn starts a fresh one with the
+    full store context (for messages added outside the CLI, e.g. reviews)
+    """
+    with cli_sessions_lock:
+        cli_sessions.pop(session_key, None)
+
+
+def cleanup_idle_cli_sessions():
+    """Forget CLI sessions idle longer than CONVERSATION_TIMEOUT"""
+    current_time = time.time()
+    with cli_sessions_lock:
+        expired = [key for key, session in cli_sessions.items()
+                   if current_time - session['last_used'] > CONVERSATION_TIMEOUT
+                   and not session['lock'].locked()]
+        for key in expired:
+            del cli_sessions[key]
+    if expired:
+        log(f'Evicted {len(expired)} idle CLI session(s)')
+
+
+def run_in_cli_session(session_key, prompt, context, run):
+    """
+    Run a CLI call inside the thread's resumable session.
+
+    The first turn starts a session with --session-id and sends the full
+    context; follow-ups use --resume and send only the new user turn. Calls
+    for the same thread are serialized so the session never forks.
+    run(full_prompt, extra_args) must return tuple: (response, status)
+    """
+    session = get_cli_session(session_key)
+
+    with session['lock']:
+        session['last_used'] = time.time()
+
+        if session['turns'] > 0:
+            response, status = run(prompt, ['--resume', session['session_id']])
+            if status != 'error':
+                if status == 'ok':
+                    session['turns'] += 1
+                session['last_used'] = time.time()
+                return response
+            log(f'Could not resume CLI session for {session_key}, starting a new one', 'WARN')
+            session['session_id'] = str(uuid.uuid4())
+            session['turns'] = 0
+
+        response, status = run(build_cli_prompt(prompt, context), ['--session-id', session['session_id']])
+        if status == 'ok':
+            session['turns'] += 1
         else:
-            full_prompt = prompt
+            # Don't reuse an id the CLI may have partially registered
+            session['session_id'] = str(uuid.uuid4())
+        session['last_used'] = time.time()
+        return response
 
-        log(f'Invoking Claude CLI with prompt: {prompt[:100]}...')
 
-        cmd = ['claude', '--print', '-p', full_prompt]
+def call_claude_cli(prompt, context=None, timeout=CLI_TIMEOUT, session_key=None):
+    """
+    Invoke Claude Code CLI and return response.
+    With a session_key, the thread's CLI session is resumed instead of
+    re-sending the conversation context.
+    """
+    log(f'Invoking Claude CLI with prompt: {prompt[:100]}...')
+
+    def run(full_prompt, extra_args):
+        return _run_claude_cli(full_prompt, extra_args, timeout)
+
+    if session_key and CLI_SESSION_REUSE:
+        return run_in_cli_session(session_key, prompt, context, run)
+    return run(build_cli_prompt(prompt, context), [])[0]
+
+
+def _run_claude_cli(full_prompt, extra_args, timeout):
+    """
+    Run `claude --print` to completion.
+    Returns tuple: (response, status) with status 'ok', 'error' or 'timeout'
+    """
+    try:
+        cmd = ['claude', '--print'] + extra_args + ['-p', full_prompt]
 
         result = subprocess.run(
             cmd,
@@ -715,25 +1171,192 @@ Please respond considering the conversation context above."""
         if result.returncode != 0:
             error_msg = result.stderr.strip() or 'Unknown error'
             log(f'Claude CLI error (code {result.returncode}): {error_msg}', 'ERROR')
-            return f"Error: {error_msg}"
+            return f"Error: {error_msg}", 'error'
 
         response = result.stdout.strip()
         log(f'Claude CLI response: {response[:100]}...')
-        return response
+        return response, 'ok'
 
     except subprocess.TimeoutExpired:
         log(f'Claude CLI timed out after {timeout}s', 'ERROR')
-        return f"Error: Request timed out after {timeout} seconds. Try a simpler query."
+        return f"Error: Request timed out after {timeout} seconds. Try a simpler query.", 'timeout'
+    except FileNotFoundError:
+        log('Claude CLI not found. Is it installed?', 'ERROR')
+        return "Error: Claude Code CLI not found. Please ensure it's installed and in PATH.", 'error'
+    except Exception as e:
+        log(f'Claude CLI exception: {e}', 'ERROR')
+        return f"Error: {str(e)}", 'error'
+
+
+def parse_stream_line(line, saw_deltas):
+    """
+    Parse one line of `claude --output-format stream-json` output.
+    Returns tuple: (text_delta, final_result, is_delta)
+    Non-JSON lines are treated as plain text output.
+    """
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return line + '\n', None, False
+
+    event_type = event.get('type')
+
+    if event_type == 'stream_event':
+        inner = event.get('event', {})
+        delta = inner.get('delta', {})
+        if inner.get('type') == 'content_block_delta' and delta.get('type') == 'text_delta':
+            return delta.get('text', ''), None, True
+    elif event_type == 'assistant' and not saw_deltas:
+        # Whole assistant turns (CLI without partial-message support)
+        blocks = event.get('message', {}).get('content', [])
+        text = ''.join(b.get('text', '') for b in blocks if b.get('type') == 'text')
+        if text:
+            return text + '\n', None, False
+    elif event_type == 'result':
+        return '', event.get('result', ''), False
+
+    return '', None, False
+
+
+def stream_claude_cli(prompt, context=None, on_text=None, timeout=CLI_TIMEOUT, session_key=None):
+    """
+    Invoke Claude Code CLI and read its output incrementally.
+    Calls on_text(text_so_far) as output arrives; returns the final response.
+    """
+    log(f'Streaming Claude CLI with prompt: {prompt[:100]}...')
+
+    def run(full_prompt, extra_args):
+        return _stream_claude_cli(full_prompt, extra_args, on_text, timeout)
+
+    if session_key and CLI_SESSION_REUSE:
+        return run_in_cli_session(session_key, prompt, context, run)
+    return run(build_cli_prompt(prompt, context), [])[0]
+
+
+def _stream_claude_cli(full_prompt, extra_args, on_text, timeout):
+    """
+    Run `claude --print` in stream-json mode, feeding on_text as output arrives.
+    Returns tuple: (response, status) with status 'ok', 'error' or 'timeout'
+    """
+    cmd = ['claude', '--print'] + CLI_STREAM_ARGS + extra_args + ['-p', full_prompt]
+
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            cwd=os.environ.get('CLAUDE_WORKDIR', str(Path(__file__).parent.parent))
+        )
     except FileNotFoundError:
         log('Claude CLI not found. Is it installed?', 'ERROR')
-        return "Error: Claude Code CLI not found. Please ensure it's installed and in PATH."
+        return "Error: Claude Code CLI not found. Please ensure it's installed and in PATH.", 'error'
     except Exception as e:
         log(f'Claude CLI exception: {e}', 'ERROR')
-        return f"Error: {str(e)}"
+        return f"Error: {str(e)}", 'error'
+
+    timed_out = threading.Event()
+
+    def kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.daemon = True
+    timer.start()
+
+    # Drain stderr concurrently so a chatty CLI can't fill the pipe and block
+    stderr_chunks = []
+    stderr_reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+    stderr_reader.start()
+
+    streamed = ''
+    final = None
+    saw_deltas = False
+    try:
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            text, result, is_delta = parse_stream_line(line, saw_deltas)
+            saw_deltas = saw_deltas or is_delta
+            if result is not None:
+                final = result
+            if text:
+                streamed += text
+                if on_text:
+                    on_text(streamed)
+        proc.wait()
+        stderr_reader.join()
+        stderr = ''.join(stderr_chunks)
+    finally:
+        timer.cancel()
 
+    if timed_out.is_set():
+        log(f'Claude CLI timed out after {timeout}s', 'ERROR')
+        return f"Error: Request timed out after {timeout} seconds. Try a simpler query.", 'timeout'
+
+    if proc.returncode != 0:
+        error_msg = stderr.strip() or 'Unknown error'
+        log(f'Claude CLI error (code {proc.returncode}): {error_msg}', 'ERROR')
+        return f"Error: {error_msg}", 'error'
+
+    response = (final if final is not None else streamed).strip()
+    log(f'Claude CLI response: {response[:100]}...')
+    return response, 'ok'
 
-def format_response(text, execution_time=None, is_thread=False):
-    """Format response for Slack with proper markdown"""
+
+def stream_cli_to_slack(client, channel, prompt, context=None, thread_ts=None, is_thread=False):
+    """
+    Post a placeholder message, stream Claude CLI output into it with
+    rate-limited chat_update edits, then write the final response.
+    The CLI session is keyed on thread_ts, or the placeholder's ts for a
+    new top-level message (which becomes the conversation thread).
+    Returns tuple: (response, execution_time, message_ts)
+    """
+    start_time = time.time()
+
+    placeholder = client.chat_postMessage(
+        channel=channel,
+        thread_ts=thread_ts,
+        text=format_response('', is_thread=is_thread, partial=True)
+    )
+    message_ts = placeholder.get('ts')
+    last_edit = 0
+
+    def on_text(text):
+        nonlocal last_edit
+        now = time.time()
+        if now - last_edit < CLI_STREAM_EDIT_INTERVAL:
+            return
+        last_edit = now
+        try:
+            client.chat_update(
+                channel=channel,
+                ts=message_ts,
+                text=format_response(text, now - start_time, is_thread=is_thread, partial=True)
+            )
+        except Exception as e:
+            log(f'Streaming edit failed: {e}', 'WARN')
+
+    response = stream_claude_cli(prompt, context=context, on_text=on_text, session_key=thread_ts or message_ts)
+    execution_time = time.time() - start_time
+
+    client.chat_update(
+        channel=channel,
+        ts=message_ts,
+        text=format_response(response, execution_time, is_thread=is_thread)
+    )
+    return response, execution_time, message_ts
+
+
+def format_response(text, execution_time=None, is_thread=False, partial=False):
+    """
+    Format response for Slack with proper markdown.
+    partial=True renders in-progress streaming output (tail-truncated,
+    unterminated code fences closed).
+    """
     if is_thread:
         header = "*Sleepless:*"
     else:
@@ -742,6 +1365,15 @@ def format_response(text, execution_time=None, is_thread=False):
     if execution_time:
         header += f" _({execution_time:.1f}s)_"
 
+    if partial:
+        header += " _(streaming…)_"
+        if not text:
+            return f"{header}\n\n_thinking…_"
+        if len(text) > CLI_STREAM_PREVIEW_CHARS:
+            text = '…' + text[-CLI_STREAM_PREVIEW_CHARS:]
+        if text.count('```') % 2 == 1:
+            text += '\n```'
+
     if '```' in text:
         return f"{header}\n\n{text}"
     elif len(text) > 500 or '\n' in text:
@@ -750,6 +1382,115 @@ def format_response(text, execution_time=None, is_thread=False):
         return f"{header}\n\n{text}"
 
 
+# ============================================================
+# Worker Pool
+# ============================================================
+
+class WorkerPool:
+    """
+    Bounded worker pool with a priority admission queue.
+
+    Jobs run on at most max_workers threads; lower priority numbers run
+    first (FIFO within a priority). submit() returns the job's queue
+    position (0 = a worker is free) or None if the queue is full.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._heap = []
+        self._seq = 0
+        self._active = 0
+        self._cond = threading.Condition()
+        self._started = False
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+
+    def start(self):
+        """Start worker threads"""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        for i in range(self.max_workers):
+            threading.Thread(target=self._worker, name=f'sleepless-worker-{i}', daemon=True).start()
+
+    def submit(self, fn, priority=PRIORITY_CLI, label='job'):
+        """Queue fn for execution. Returns queue position, or None if rejected."""
+        with self._cond:
+            # Jobs already pushed may not have been picked up by an idle worker yet
+            free_workers = max(0, self.max_workers - self._active)
+            if len(self._heap) - free_workers >= self.max_queue:
+                self._rejected += 1
+                log(f'Worker queue full, rejected {label}', 'WARN')
+                return None
+
+            ahead = sum(1 for item in self._heap if item[0] <= priority)
+            position = max(0, ahead + 1 - free_workers)
+
+            heapq.heappush(self._heap, (priority, self._seq, time.time(), fn, label))
+            self._seq += 1
+            self._cond.notify()
+
+        if position:
+            log(f'Queued {label} at position {position}')
+        return position
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                priority, _, enqueued_at, fn, label = heapq.heappop(self._heap)
+                self._active += 1
+                wait = time.time() - enqueued_at
+                self._last_wait = wait
+                self._max_wait = max(self._max_wait, wait)
+                self._total_wait += wait
+
+            try:
+                fn()
+            except Exception as e:
+                log(f'Worker job {label} failed: {e}', 'ERROR')
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._completed += 1
+
+    def stats(self):
+        """Get queue depth, concurrency and wait-time stats"""
+        with self._cond:
+            dequeued = self._completed + self._active
+            return {
+                'max_concurrency': self.max_workers,
+                'active': self._active,
+                'queue_depth': len(self._heap),
+                'queue_max': self.max_queue,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'last_wait_s': round(self._last_wait, 2),
+                'avg_wait_s': round(self._total_wait / dequeued, 2) if dequeued else 0.0,
+                'max_wait_s': round(self._max_wait, 2),
+                'oldest_queued_s': round(time.time() - min(i[2] for i in self._heap), 2) if self._heap else 0.0,
+            }
+
+
+command_pool = WorkerPool(WORKER_MAX_CONCURRENCY, WORKER_QUEUE_MAX)
+review_pool = WorkerPool(REVIEW_WORKERS, REVIEW_QUEUE_MAX)
+
+
+def queue_notice(position):
+    """Text for an overloaded-queue reply, or None if the job starts immediately"""
+    if position is None:
+        return "🚦 Sleepless is at capacity right now - please try again in a few minutes."
+    if position > 0:
+        return f"⏳ Queued, position {position} - all {WORKER_MAX_CONCURRENCY} workers are busy."
+    return None
+
+
 # ============================================================
 # Slack App
 # ============================================================
@@ -829,13 +1570,13 @@ def create_app():
                 with open(get_heartbeat_path()) as f:
                     heartbeat = json.load(f)
 
-                with conversations_lock:
-                    active_threads = len([t for t in thread_conversations.values() if t['messages']])
+                active_threads = conversation_store.count_active()
 
                 with review_stats_lock:
                     daily_reviews = review_stats.get('count', 0)
 
                 circuit_status = "🔴 OPEN" if is_circuit_breaker_open() else "🟢 Closed"
+                pool_stats = command_pool.stats()
 
                 # Get improvement backlog status
                 imp_status = ""
@@ -866,6 +1607,7 @@ def create_app():
                     f"• Status: {heartbeat.get('status', 'unknown')}\n"
                     f"• PID: {heartbeat.get('pid', 'unknown')}\n"
                     f"• Active threads: {active_threads}\n"
+                    f"• Workers: {pool_stats['active']}/{pool_stats['max_concurrency']} busy, {pool_stats['queue_depth']} queued\n"
                     f"• Daily reviews: {daily_reviews}/{REVIEW_MAX_PER_DAY}\n"
                     f"• Circuit breaker: {circuit_status}\n"
                     f"• Features: commands, mentions, threads, auto-review, improvements"
@@ -1031,8 +1773,14 @@ def create_app():
                         with _improve_lock:
                             _improve_running = False
 
-            thread = threading.Thread(target=run_improve_command)
-            thread.start()
+            priority = PRIORITY_CLI if is_execution else PRIORITY_READ_ONLY
+            position = command_pool.submit(run_improve_command, priority, label=f'improve {imp_args}')
+            if position is None and is_execution:
+                with _improve_lock:
+                    _improve_running = False
+            notice = queue_notice(position)
+            if notice:
+                respond({"response_type": "ephemeral", "text": notice})
             return
 
         # Handle yc (yellowCircle) commands
@@ -1076,8 +1824,10 @@ def create_app():
                         text=f"*yc {yc_args}:* ❌ Error: {str(e)}"
                     )
 
-            thread = threading.Thread(target=run_yc_command)
-            thread.start()
+            position = command_pool.submit(run_yc_command, PRIORITY_COMMAND, label=f'yc {yc_args}')
+            notice = queue_notice(position)
+            if notice:
+                respond({"response_type": "ephemeral", "text": notice})
             return
 
         # Process command in background thread
@@ -1085,13 +1835,19 @@ def create_app():
             start_time = time.time()
 
             try:
-                response = call_claude_cli(text)
-                execution_time = time.time() - start_time
-                formatted = format_response(response, execution_time)
+                if CLI_STREAMING:
+                    response, execution_time, thread_ts = stream_cli_to_slack(client, channel_id, text)
+                else:
+                    # Reply ts (the conversation thread) isn't known until after posting
+                    session_key = f'command-{uuid.uuid4()}'
+                    response = call_claude_cli(text, session_key=session_key)
+                    execution_time = time.time() - start_time
+                    formatted = format_response(response, execution_time)
 
-                result = client.chat_postMessage(channel=channel_id, text=formatted)
+                    result = client.chat_postMessage(channel=channel_id, text=formatted)
 
-                thread_ts = result.get('ts')
+                    thread_ts = result.get('ts')
+                    rebind_cli_session(session_key, thread_ts)
                 if thread_ts:
                     add_to_conversation(thread_ts, 'user', text, channel_id, is_user=True)
                     add_to_conversation(thread_ts, 'assistant', response)
@@ -1103,8 +1859,10 @@ def create_app():
                 log(f'Error processing command: {e}', 'ERROR')
                 respond({"response_type": "ephemeral", "text": f"*Error:* {str(e)}"})
 
-        thread = threading.Thread(target=process_command)
-        thread.start()
+        position = command_pool.submit(process_command, PRIORITY_CLI, label='command')
+        notice = queue_notice(position)
+        if notice:
+            respond({"response_type": "ephemeral", "text": notice})
 
     # Handle @sleepless mentions
     @app.event("app_mention")
@@ -1125,15 +1883,30 @@ def create_app():
 
         context = get_conversation_context(thread_ts) if thread_ts else None
 
-        start_time = time.time()
-        response = call_claude_cli(clean_text, context=context)
-        execution_time = time.time() - start_time
+        # Run the CLI on the worker pool so the Bolt listener can ack immediately
+        def process_mention():
+            if CLI_STREAMING:
+                response, execution_time, _ = stream_cli_to_slack(
+                    client, channel, clean_text, context=context, thread_ts=thread_ts, is_thread=bool(context)
+                )
+                add_to_conversation(thread_ts, 'user', clean_text, channel, is_user=True)
+                add_to_conversation(thread_ts, 'assistant', response)
+                return
+
+            start_time = time.time()
+            response = call_claude_cli(clean_text, context=context, session_key=thread_ts)
+            execution_time = time.time() - start_time
+
+            add_to_conversation(thread_ts, 'user', clean_text, channel, is_user=True)
+            add_to_conversation(thread_ts, 'assistant', response)
 
-        add_to_conversation(thread_ts, 'user', clean_text, channel, is_user=True)
-        add_to_conversation(thread_ts, 'assistant', response)
+            formatted = format_response(response, execution_time, is_thread=bool(context))
+            say(formatted, thread_ts=thread_ts)
 
-        formatted = format_response(response, execution_time, is_thread=bool(context))
-        say(formatted, thread_ts=thread_ts)
+        position = command_pool.submit(process_mention, PRIORITY_CLI, label=f'mention {thread_ts}')
+        notice = queue_notice(position)
+        if notice:
+            say(notice, thread_ts=thread_ts)
 
     # Handle thread replies
     @app.event("message")
@@ -1163,14 +1936,20 @@ def create_app():
             start_time = time.time()
 
             try:
-                response = call_claude_cli(clean_text, context=context)
-                execution_time = time.time() - start_time
+                if CLI_STREAMING:
+                    response, execution_time, _ = stream_cli_to_slack(
+                        client, channel, clean_text, context=context, thread_ts=thread_ts, is_thread=True
+                    )
+                else:
+                    response = call_claude_cli(clean_text, context=context, session_key=thread_ts)
+                    execution_time = time.time() - start_time
 
                 add_to_conversation(thread_ts, 'user', clean_text, channel, is_user=True)
                 add_to_conversation(thread_ts, 'assistant', response)
 
-                formatted = format_response(response, execution_time, is_thread=True)
-                say(formatted, thread_ts=thread_ts)
+                if not CLI_STREAMING:
+                    formatted = format_response(response, execution_time, is_thread=True)
+                    say(formatted, thread_ts=thread_ts)
 
                 log(f'Thread response sent in {execution_time:.1f}s')
 
@@ -1178,8 +1957,10 @@ def create_app():
                 log(f'Error processing thread reply: {e}', 'ERROR')
                 say(f"*Error:* {str(e)}", thread_ts=thread_ts)
 
-        thread = threading.Thread(target=process_reply)
-        thread.start()
+        position = command_pool.submit(process_reply, PRIORITY_CLI, label=f'reply {thread_ts}')
+        notice = queue_notice(position)
+        if notice:
+            say(notice, thread_ts=thread_ts)
 
     return app
 
@@ -1197,6 +1978,7 @@ def heartbeat_loop():
         cleanup_counter += 1
         if cleanup_counter >= 10:
             cleanup_old_conversations()
+            cleanup_idle_cli_sessions()
             cleanup_counter = 0
         time.sleep(HEARTBEAT_INTERVAL)
 
@@ -1234,7 +2016,7 @@ def health_watchdog():
         if consecutive_failures >= HEALTH_MAX_CONSECUTIVE_FAILURES:
             log(f'Health watchdog: {consecutive_failures} consecutive failures, triggering restart', 'ERROR')
             write_heartbeat('unhealthy')
-            review_stop_event.set()
+            stop_review_loop()
             os._exit(2)  # Non-zero, non-standard exit triggers supervisor restart
 
         time.sleep(HEALTH_CHECK_INTERVAL)
@@ -1243,7 +2025,7 @@ def health_watchdog():
 def shutdown_handler(signum, frame):
     """Handle graceful shutdown"""
     log('Shutdown signal received')
-    review_stop_event.set()
+    stop_review_loop()
     write_heartbeat('stopped')
     sys.exit(0)
 
@@ -1252,6 +2034,8 @@ def main():
     """Main entry point"""
     load_env()
     load_review_stats()
+    init_conversation_store()
+    init_llm_cache()
 
     slack_app_token = os.environ.get('SLACK_APP_TOKEN')
 
@@ -1264,6 +2048,10 @@ def main():
 
     app = create_app()
 
+    # Start command and review worker pools
+    command_pool.start()
+    review_pool.start()
+
     # Start heartbeat thread
     heartbeat_thread = threading.Thread(target=heartbeat_loop, daemon=True)
     heartbeat_thread.start()
@@ -1287,7 +2075,10 @@ def main():
     log(f'  Features:')
     log(f'    - /sleepless commands')
     log(f'    - @sleepless mentions')
-    log(f'    - Thread conversations')
+    log(f'    - Thread conversations ({CONVERSATION_STORE} store)')
+    log(f'    - CLI streaming: {"on" if CLI_STREAMING else "off"}')
+    log(f'    - CLI session reuse: {"on" if CLI_SESSION_REUSE else "off"}')
+    log(f'    - Worker pool: {WORKER_MAX_CONCURRENCY} workers, queue {WORKER_QUEUE_MAX}')
     log(f'    - Multi-LLM auto-review (1hr inactivity)')
     log(f'    - /sleepless improve (autonomous UI/UX improvements)')
     log(f'  Review Config:')
@@ -1295,7 +2086,8 @@ def main():
     log(f'    - Max runtime: {REVIEW_MAX_RUNTIME}s')
     log(f'    - Max per thread: {REVIEW_MAX_PER_THREAD}')
     log(f'    - Max per day: {REVIEW_MAX_PER_DAY}')
-    log(f'  LLM Tiers: {" → ".join([t["name"] for t in LLM_TIERS if t.get("enabled")])}')
+    log(f'    - Workers: {REVIEW_WORKERS}')
+    log(f'  LLM Tiers: {" → ".join([t["name"] for t in get_enabled_tiers()])} ({REVIEW_LLM_MODE})')
     log('')
     log('Listening for commands...')
     log('')
@@ -1308,7 +2100,7 @@ def main():
     except KeyboardInterrupt:
         log('Interrupted by user')
     finally:
-        review_stop_event.set()
+        stop_review_loop()
         write_heartbeat('stopped')
         log('Daemon stopped')
 